@@ -0,0 +1,69 @@
+"""Асинхронные обёртки над вьюсетами для работы под ASGI.
+
+В Django 3.2 нет асинхронного интерфейса ORM, поэтому чтение вместе
+с сериализацией и рендерингом ответа выполняется в пуле потоков
+(`thread_sensitive=False`), а не в единственном потоке, через который
+ASGI-обработчик пропускает синхронные представления. Цикл событий при
+этом не блокируется, а число одновременных запросов на чтение
+ограничено размером пула, а не одним потоком. Включаются переменной
+окружения API_ASYNC_READ_VIEWS=1 и действуют, только если все middleware
+поддерживают асинхронный режим.
+"""
+import functools
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import URLPattern
+from rest_framework import permissions
+
+from .middleware import current_recorder, record_queries
+
+ASYNC_READ_BASENAMES = ('titles', 'genres', 'categories', 'reviews',
+                        'comments')
+
+
+def run_read_view(view, request, *args, **kwargs):
+    """Выполняет представление в рабочем потоке и закрывает
+    соединение с БД этого потока по правилам CONN_MAX_AGE. Запросы к БД
+    учитываются в метриках запроса, если они включены."""
+    close_old_connections()
+    recorder = current_recorder.get()
+    try:
+        with record_queries(recorder) if recorder else nullcontext():
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(view):
+    """Асинхронное представление: безопасные методы выполняются
+    в пуле потоков, изменяющие — как обычно, в общем потоке."""
+    run_in_pool = sync_to_async(run_read_view, thread_sensitive=False)
+    run_in_main = sync_to_async(view)
+
+    @functools.wraps(view)
+    async def handler(request, *args, **kwargs):
+        if request.method in permissions.SAFE_METHODS:
+            return await run_in_pool(view, request, *args, **kwargs)
+        return await run_in_main(request, *args, **kwargs)
+    return handler
+
+
+def with_async_reads(urlpatterns):
+    """Заменяет представления каталога и отзывов асинхронными."""
+    return [
+        URLPattern(
+            pattern.pattern,
+            async_read_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        )
+        if pattern.name
+        and pattern.name.split('-')[0] in ASYNC_READ_BASENAMES
+        else pattern
+        for pattern in urlpatterns
+    ]
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from reviews.models import User
+
+# Model.from_db ожидает значения в порядке полей модели.
+USER_SNAPSHOT_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in {
+        'id', 'username', 'email', 'first_name', 'last_name', 'bio',
+        'role', 'is_staff', 'is_superuser', 'is_active',
+    }
+)
+
+
+def get_user_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def get_user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_user_snapshot(user_id):
+    get_user_cache().delete(get_user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, которая берёт пользователя из кэша.
+    В кэше хранятся только поля профиля и ролей, остальные поля
+    (например, пароль) загружаются из БД при первом обращении.
+    Изменения пользователя видны всем процессам сразу, только если
+    AUTH_USER_CACHE_ALIAS — общий для них кэш."""
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_FIELD != 'id' or getattr(
+            api_settings, 'CHECK_REVOKE_TOKEN', False
+        ):
+            return super().get_user(validated_token)
+        key = get_user_cache_key(
+            validated_token.get(api_settings.USER_ID_CLAIM)
+        )
+        cache = get_user_cache()
+        values = cache.get(key)
+        if values is None:
+            user = super().get_user(validated_token)
+            cache.set(
+                key,
+                tuple(getattr(user, field) for field in USER_SNAPSHOT_FIELDS),
+                settings.AUTH_USER_CACHE_TIMEOUT,
+            )
+            return user
+        return User.from_db(
+            router.db_for_read(User), USER_SNAPSHOT_FIELDS, values
+        )
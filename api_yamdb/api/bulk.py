@@ -0,0 +1,231 @@
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers, status
+
+from reviews.leaderboards import sync_titles
+from reviews.models import Category, Genre, Review, Title
+from reviews.ratings import apply_created_reviews
+from reviews.search import mark_stale
+from .cache import bump_generation
+from .serializers import ReviewBulkItemSerializer, TitleBulkItemSerializer
+
+TITLE_NOT_FOUND = 'Произведение не найдено.'
+TITLE_REPEATED = 'Произведение уже изменяется в этом запросе.'
+REVIEW_EXISTS = 'Отзыв уже создан'
+SLUG_NOT_FOUND = serializers.SlugRelatedField.default_error_messages[
+    'does_not_exist'
+]
+
+
+def validate_items(items, serializer_class, get_kwargs=lambda item: {}):
+    """Проверяет элементы пачки сериализатором без обращений к БД.
+    Возвращает проверенные данные по индексам и результаты с ошибками."""
+    results = [None] * len(items)
+    validated = {}
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item, **get_kwargs(item))
+        if serializer.is_valid():
+            validated[index] = serializer.validated_data
+        else:
+            results[index] = {
+                'status': status.HTTP_400_BAD_REQUEST,
+                'errors': serializer.errors,
+            }
+    return validated, results
+
+
+def slug_error(slug):
+    return str(SLUG_NOT_FOUND).format(slug_name='slug', value=slug)
+
+
+def create_reviews(author, items):
+    """Создаёт отзывы автора пачкой и возвращает результат по каждому
+    элементу в исходном порядке.
+
+    Проверки выполняются двумя запросами на всю пачку, вставка — одним
+    `bulk_create` в транзакции. Уникальность пары автор–произведение
+    при гонке с параллельной вставкой гарантирует UniqueConstraint:
+    IntegrityError откатывает пачку целиком.
+    """
+    validated, results = validate_items(items, ReviewBulkItemSerializer)
+
+    title_ids = {data['title'] for data in validated.values()}
+    existing_titles = set(
+        Title.objects.filter(pk__in=title_ids).values_list('pk', flat=True)
+    )
+    reviewed_titles = set(
+        Review.objects.filter(
+            author=author, title__in=existing_titles
+        ).values_list('title_id', flat=True)
+    )
+    reviews = {}
+    for index, data in validated.items():
+        title_id = data['title']
+        if title_id not in existing_titles:
+            error = {'title': [TITLE_NOT_FOUND]}
+        elif title_id in reviewed_titles:
+            error = {'non_field_errors': [REVIEW_EXISTS]}
+        else:
+            reviewed_titles.add(title_id)
+            reviews[index] = Review(
+                author=author,
+                title_id=title_id,
+                text=data['text'],
+                score=data['score'],
+            )
+            continue
+        results[index] = {
+            'status': status.HTTP_400_BAD_REQUEST, 'errors': error
+        }
+
+    if reviews:
+        with transaction.atomic():
+            Review.objects.bulk_create(
+                reviews.values(), batch_size=settings.REVIEWS_BULK_MAX_ITEMS
+            )
+            apply_created_reviews(reviews.values())
+        created_ids = dict(
+            Review.objects.filter(
+                author=author,
+                title__in=[review.title_id for review in reviews.values()],
+            ).values_list('title_id', 'pk')
+        )
+        bump_generation()
+        mark_stale()
+    for index, review in reviews.items():
+        results[index] = {
+            'status': status.HTTP_201_CREATED,
+            'id': created_ids[review.title_id],
+            'title': review.title_id,
+        }
+    return results
+
+
+def _assign_created_pks(titles):
+    """SQLite не возвращает идентификаторы из `bulk_create`. Внутри той
+    же транзакции БД заблокирована на запись, поэтому последние
+    идентификаторы таблицы принадлежат только что вставленным строкам."""
+    if not titles or titles[0].pk is not None:
+        return
+    pks = Title.objects.order_by('-pk').values_list('pk', flat=True)[
+        :len(titles)
+    ]
+    for title, pk in zip(titles, reversed(list(pks))):
+        title.pk = pk
+
+
+def _resolve_title_refs(validated):
+    """Жанры и категории по slug-ам и существующие произведения пачки."""
+    genres = dict(Genre.objects.filter(slug__in={
+        slug for data in validated.values() for slug in data.get('genre', ())
+    }).values_list('slug', 'pk'))
+    categories = dict(Category.objects.filter(slug__in={
+        data['category'] for data in validated.values() if 'category' in data
+    }).values_list('slug', 'pk'))
+    title_ids = {data['id'] for data in validated.values() if 'id' in data}
+    existing = set(
+        Title.objects.filter(pk__in=title_ids).values_list('pk', flat=True)
+    ) if title_ids else set()
+    return genres, categories, existing
+
+
+def _title_errors(data, genres, categories, existing, updated_ids):
+    errors = {}
+    title_id = data.get('id')
+    if title_id is not None and title_id not in existing:
+        errors['id'] = [TITLE_NOT_FOUND]
+    elif title_id in updated_ids:
+        errors['id'] = [TITLE_REPEATED]
+    unknown = [slug for slug in data.get('genre', ()) if slug not in genres]
+    if unknown:
+        errors['genre'] = [slug_error(slug) for slug in unknown]
+    if 'category' in data and data['category'] not in categories:
+        errors['category'] = [slug_error(data['category'])]
+    return errors
+
+
+def _write_titles(created, updated, links):
+    """Записывает пачку в одной транзакции: вставка, изменения по наборам
+    полей, замена связей с жанрами и строки рейтингов."""
+    through = Title.genre.through
+    with transaction.atomic():
+        titles = list(created.values())
+        Title.objects.bulk_create(
+            titles, batch_size=settings.TITLES_BULK_MAX_ITEMS
+        )
+        _assign_created_pks(titles)
+        by_fields = {}
+        for title, fields in updated.values():
+            by_fields.setdefault(fields, []).append(title)
+        for fields, titles in by_fields.items():
+            if fields:
+                Title.objects.bulk_update(titles, fields)
+        relinked = [
+            updated[index][0].pk for index in links if index in updated
+        ]
+        if relinked:
+            through.objects.filter(title_id__in=relinked).delete()
+        through.objects.bulk_create([
+            through(
+                title_id=(created.get(index) or updated[index][0]).pk,
+                genre_id=genre_id,
+            )
+            for index, genre_ids in links.items()
+            for genre_id in genre_ids
+        ], batch_size=settings.TITLES_BULK_MAX_ITEMS)
+        sync_titles(
+            [title.pk for title in created.values()]
+            + [title.pk for title, _ in updated.values()]
+        )
+
+
+def save_titles(items):
+    """Создаёт произведения без `id` и изменяет переданные поля
+    произведений с `id`; результат — по каждому элементу в исходном
+    порядке.
+
+    Slug-и жанров и категорий и идентификаторы изменяемых произведений
+    проверяются тремя запросами на всю пачку. Произведения вставляются
+    одним `bulk_create`, изменяются `bulk_update` по набору полей, а связи
+    с жанрами пишутся одной пачкой. Рейтинги, кэш каталога и индекс
+    поиска обновляются один раз на пачку.
+    """
+    validated, results = validate_items(
+        items, TitleBulkItemSerializer,
+        lambda item: {'partial': isinstance(item, dict) and 'id' in item},
+    )
+    genres, categories, existing = _resolve_title_refs(validated)
+    created, updated, links = {}, {}, {}
+    updated_ids = set()
+    for index, data in validated.items():
+        errors = _title_errors(data, genres, categories, existing, updated_ids)
+        if errors:
+            results[index] = {
+                'status': status.HTTP_400_BAD_REQUEST, 'errors': errors
+            }
+            continue
+        fields = {
+            name: data[name] for name in ('name', 'year', 'description')
+            if name in data
+        }
+        if 'category' in data:
+            fields['category_id'] = categories[data['category']]
+        if 'id' in data:
+            updated[index] = (Title(pk=data['id'], **fields), tuple(fields))
+            updated_ids.add(data['id'])
+        else:
+            created[index] = Title(**fields)
+        if 'genre' in data:
+            links[index] = dict.fromkeys(
+                genres[slug] for slug in data['genre']
+            )
+
+    if created or updated:
+        _write_titles(created, updated, links)
+        bump_generation()
+        mark_stale()
+    for index, title in created.items():
+        results[index] = {'status': status.HTTP_201_CREATED, 'id': title.pk}
+    for index, (title, _) in updated.items():
+        results[index] = {'status': status.HTTP_200_OK, 'id': title.pk}
+    return results
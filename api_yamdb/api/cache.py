@@ -0,0 +1,91 @@
+import time
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .routers import served_by_replica
+
+GENERATION_KEY = 'catalog:generation'
+# Есть, пока реплики могут отставать от последней смены поколения.
+FRESH_KEY = 'catalog:fresh'
+
+
+def get_catalog_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def get_generation():
+    """Текущее поколение каталога. Входит в ключи кэша и в ETag,
+    поэтому его смена делает недействительными все ответы сразу."""
+    cache = get_catalog_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Начальное значение от времени не совпадёт с поколениями,
+        # ключи которых могли остаться в кэше после вытеснения счётчика.
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    cache = get_catalog_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+    cache.set(FRESH_KEY, True, settings.READ_REPLICAS['PIN_SECONDS'])
+
+
+def is_cacheable_read():
+    """Ответ, прочитанный с реплики сразу после смены поколения, может
+    не содержать последней записи: его нельзя сохранять под новым
+    поколением."""
+    return not (
+        served_by_replica() and get_catalog_cache().get(FRESH_KEY, False)
+    )
+
+
+class CatalogCacheMixin:
+    """Кэширует ответы на GET-запросы списка по адресу и параметрам
+    запроса, отвечает 304 по `If-None-Match`. Для других действий
+    используется `get_cached_response`."""
+
+    def get_cache_tag(self, request):
+        # Схема и хост входят в ключ: ссылки пагинации в ответе абсолютные.
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        url = request.build_absolute_uri(request.path)
+        source = f'{get_generation()}:{url}?{query}'
+        return md5(source.encode()).hexdigest()
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        tag = self.get_cache_tag(request)
+        etag = f'"{tag}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        cache = get_catalog_cache()
+        key = f'catalog:response:{tag}'
+        data = cache.get(key)
+        if data is None:
+            response = handler(request, *args, **kwargs)
+            if (
+                response.status_code != status.HTTP_200_OK
+                or not is_cacheable_read()
+            ):
+                return response
+            cache.set(key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
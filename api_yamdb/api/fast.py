@@ -0,0 +1,215 @@
+"""Быстрое чтение списков без экземпляров моделей и сериализаторов.
+
+По описанию сериализатора один раз собирается план: какие столбцы
+выбрать через `.values()` и как превратить строку в словарь ответа.
+Внешние ключи и slug-и связанных объектов читаются тем же запросом,
+связи «многие ко многим» — одним запросом на страницу.
+Ответ совпадает с ответом сериализатора побайтно. Поля, для которых
+план собрать нельзя, возвращают вьюсет к обычной сериализации.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Поля, у которых to_representation не меняет значение из БД.
+PLAIN_FIELDS = (
+    serializers.CharField, serializers.IntegerField,
+    serializers.BooleanField,
+)
+_plans = {}
+
+
+class ReadPlan:
+
+    def __init__(self, model):
+        self.model = model
+        self.columns = ['pk']
+        self.fields = []
+        self.many = []
+
+    def add_column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return path
+
+    def add(self, name, columns, convert):
+        self.fields.append((name, tuple(columns), convert))
+
+    def values(self, queryset, ordering=()):
+        """Строки для пагинатора; курсорной пагинации нужны столбцы
+        сортировки."""
+        columns = self.columns + [
+            path.lstrip('-') for path in ordering
+            if path.lstrip('-') not in self.columns
+        ]
+        return queryset.select_related(None).prefetch_related(None).values(
+            *columns
+        )
+
+    def rows(self, rows):
+        related = {
+            name: self.fetch_many(field, columns, rows)
+            for name, field, columns in self.many
+        }
+        result = []
+        for row in rows:
+            data = {}
+            for name, columns, convert in self.fields:
+                if columns is None:
+                    data[name] = related[name].get(row['pk'], [])
+                    continue
+                data[name] = convert(*(row[column] for column in columns))
+            result.append(data)
+        return result
+
+    def fetch_many(self, field, columns, rows):
+        related_name = field.related_query_name()
+        values = field.related_model._default_manager.filter(**{
+            f'{related_name}__in': [row['pk'] for row in rows]
+        }).values_list(related_name, *columns)
+        result = defaultdict(list)
+        for owner, *items in values:
+            result[owner].append(
+                dict(zip(columns, items)) if len(columns) > 1 else items[0]
+            )
+        return result
+
+
+def _renders_natively(field):
+    """Даты в UTC JSON-рендерер кодирует сам так же, как DateTimeField,
+    поэтому они передаются ему без преобразования."""
+    return (
+        isinstance(field, serializers.DateTimeField)
+        and str(
+            getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        ).lower() == ISO_8601
+        and getattr(field, 'timezone', None) is None
+        and settings.USE_TZ and settings.TIME_ZONE == 'UTC'
+    )
+
+
+def _plain(field):
+    if isinstance(field, PLAIN_FIELDS) or _renders_natively(field):
+        return lambda value: value
+
+    def convert(value):
+        return None if value is None else field.to_representation(value)
+    return convert
+
+
+def _nested_columns(serializer):
+    """Простые поля вложенного сериализатора, иначе None."""
+    columns = []
+    for name, field in serializer.fields.items():
+        if not isinstance(field, PLAIN_FIELDS) or field.source != name:
+            return None
+        columns.append(name)
+    return columns
+
+
+def _add_many(plan, name, field, model_field):
+    """Связь «многие ко многим»: вложенные объекты или slug-и."""
+    child = getattr(field, 'child', None) or getattr(
+        field, 'child_relation', None
+    )
+    if isinstance(child, serializers.ModelSerializer):
+        columns = _nested_columns(child)
+    elif isinstance(child, serializers.SlugRelatedField):
+        columns = [child.slug_field]
+    else:
+        return False
+    if columns is None:
+        return False
+    plan.many.append((name, model_field, columns))
+    plan.fields.append((name, None, None))
+    return True
+
+
+def _add_relation(plan, name, field, model_field):
+    """Внешний ключ: slug связанного объекта или вложенный объект."""
+    if isinstance(field, serializers.SlugRelatedField):
+        plan.add(name, [
+            plan.add_column(f'{field.source}__{field.slug_field}')
+        ], lambda value: value)
+        return True
+    if not isinstance(field, serializers.ModelSerializer):
+        return False
+    columns = _nested_columns(field)
+    if columns is None:
+        return False
+    paths = [
+        plan.add_column(f'{field.source}__{column}') for column in columns
+    ]
+    plan.add(
+        name, [plan.add_column(model_field.attname), *paths],
+        _make_nested(columns),
+    )
+    return True
+
+
+def compile_plan(serializer):
+    model = serializer.Meta.model
+    plan = ReadPlan(model)
+    fast_fields = getattr(serializer, 'fast_fields', {})
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in fast_fields:
+            columns, convert = fast_fields[name]
+            plan.add(name, [plan.add_column(c) for c in columns], convert)
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if model_field.many_to_many:
+            added = _add_many(plan, name, field, model_field)
+        elif model_field.is_relation:
+            added = _add_relation(plan, name, field, model_field)
+        else:
+            added = True
+            plan.add(name, [plan.add_column(field.source)], _plain(field))
+        if not added:
+            return None
+    return plan
+
+
+def _make_nested(columns):
+    def convert(fk, *values):
+        return None if fk is None else dict(zip(columns, values))
+    return convert
+
+
+def get_read_plan(serializer):
+    """План чтения для сериализатора с учётом выбранных полей."""
+    key = (type(serializer), tuple(serializer.fields), tuple(
+        type(field) for field in serializer.fields.values()
+    ))
+    if key not in _plans:
+        _plans[key] = compile_plan(serializer)
+    return _plans[key]
+
+
+class FastListMixin:
+    """Отдаёт список через план чтения, если он есть для сериализатора
+    и включён настройкой `FAST_READ_SERIALIZERS`."""
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_READ_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+        plan = get_read_plan(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        paginator = self.paginator
+        rows = plan.values(
+            self.filter_queryset(self.get_queryset()),
+            getattr(paginator, 'ordering', None) or (),
+        )
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(plan.rows(list(rows)))
+        return self.get_paginated_response(plan.rows(page))
@@ -0,0 +1,194 @@
+"""Очередь исходящих писем.
+
+Письмо сохраняется в таблицу очереди в транзакции запроса, а доставляет
+его обработчик пачками через одно соединение с почтовым сервером.
+Неудачные попытки повторяются с экспоненциальной задержкой, пока их
+число не достигнет MAIL_QUEUE['MAX_ATTEMPTS']. Обработчик выбирается
+настройкой MAIL_QUEUE['WORKER']:
+    thread  — фоновый поток в процессе приложения;
+    command — отдельный процесс `manage.py send_queued_mail`;
+    sync    — сразу после фиксации транзакции запроса (тесты, отладка).
+Пачку писем обработчик сначала помечает своей меткой одним UPDATE,
+поэтому несколько процессов не отправят одно письмо дважды.
+"""
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from reviews.models import OutboundEmail
+from .metrics import MAIL_DELIVERIES
+
+logger = logging.getLogger('api.mail')
+
+SENT = (('result', 'sent'),)
+FAILED = (('result', 'failed'),)
+
+
+def get_option(name):
+    return settings.MAIL_QUEUE[name]
+
+
+def enqueue_mail(subject, body, to, from_email=None):
+    """Ставит письмо в очередь; обработчик узнает о нём после фиксации
+    текущей транзакции."""
+    message = OutboundEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.EMAIL_ADMIN,
+        to=to,
+    )
+    transaction.on_commit(notify_worker)
+    return message
+
+
+def notify_worker():
+    worker = get_option('WORKER')
+    if worker == 'sync':
+        deliver_pending()
+    elif worker == 'thread':
+        mail_worker.wake()
+
+
+def pending_messages():
+    return OutboundEmail.objects.filter(
+        sent_at__isnull=True, attempts__lt=get_option('MAX_ATTEMPTS')
+    )
+
+
+def queue_depth():
+    """Количество неотправленных писем для метрик."""
+    unsent = OutboundEmail.objects.filter(sent_at__isnull=True)
+    pending = pending_messages().count()
+    return {
+        (('state', 'pending'),): pending,
+        (('state', 'failed'),): unsent.count() - pending,
+    }
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(
+        get_option('RETRY_DELAY') * 2 ** (attempts - 1),
+        get_option('MAX_RETRY_DELAY'),
+    ))
+
+
+def claim_batch(batch_size, now):
+    """Помечает до `batch_size` писем, срок отправки которых наступил,
+    и продлевает их срок на время обработки."""
+    token = uuid.uuid4().hex
+    due = pending_messages().filter(next_attempt_at__lte=now)
+    claimed = due.filter(pk__in=due.order_by(
+        'next_attempt_at', 'pk'
+    ).values('pk')[:batch_size]).update(
+        claim=token,
+        next_attempt_at=now + timedelta(seconds=get_option('LEASE')),
+    )
+    if not claimed:
+        return []
+    return list(OutboundEmail.objects.filter(claim=token).order_by('pk'))
+
+
+def send_messages(messages):
+    """Отправляет письма через одно соединение. Возвращает
+    идентификаторы отправленных писем и ошибки остальных."""
+    sent, failed = [], {}
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as error:
+        return sent, {message: error for message in messages}
+    try:
+        for message in messages:
+            try:
+                EmailMessage(
+                    message.subject, message.body, message.from_email,
+                    [message.to], connection=connection,
+                ).send()
+            except Exception as error:
+                failed[message] = error
+            else:
+                sent.append(message.pk)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def deliver_batch(batch_size=None):
+    """Доставляет одну пачку писем. Возвращает количество отправленных
+    и неудачно отправленных писем."""
+    now = timezone.now()
+    messages = claim_batch(batch_size or get_option('BATCH_SIZE'), now)
+    if not messages:
+        return 0, 0
+    sent, failed = send_messages(messages)
+    if sent:
+        OutboundEmail.objects.filter(pk__in=sent).update(
+            sent_at=timezone.now(), claim=''
+        )
+    retries = defaultdict(list)
+    for message, error in failed.items():
+        logger.warning('Письмо %s не отправлено: %s', message.pk, error)
+        retries[message.attempts + 1, str(error)].append(message.pk)
+    for (attempts, error), pks in retries.items():
+        OutboundEmail.objects.filter(pk__in=pks).update(
+            attempts=attempts,
+            next_attempt_at=now + retry_delay(attempts),
+            last_error=error,
+            claim='',
+        )
+    MAIL_DELIVERIES.inc(SENT, len(sent))
+    MAIL_DELIVERIES.inc(FAILED, len(failed))
+    return len(sent), len(failed)
+
+
+def deliver_pending(batch_size=None):
+    """Доставляет пачками все письма, срок отправки которых наступил."""
+    batch_size = batch_size or get_option('BATCH_SIZE')
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = deliver_batch(batch_size)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size:
+            return total_sent, total_failed
+
+
+class MailWorker:
+    """Фоновый поток доставки. Просыпается по сигналу после постановки
+    письма в очередь и раз в MAIL_QUEUE['POLL_INTERVAL'] секунд — для
+    повторных попыток."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def wake(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self.run, name='mail-queue', daemon=True
+                )
+                self._thread.start()
+        self._event.set()
+
+    def run(self):
+        while get_option('WORKER') == 'thread':
+            self._event.wait(get_option('POLL_INTERVAL'))
+            self._event.clear()
+            try:
+                deliver_pending()
+            except Exception:
+                logger.exception('Ошибка обработчика очереди писем')
+            finally:
+                connections.close_all()
+
+
+mail_worker = MailWorker()
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.mail import deliver_pending, get_option
+
+
+class Command(BaseCommand):
+    help = (
+        'Доставляет письма из очереди пачками. Без --once работает '
+        'постоянно и проверяет очередь раз в --interval секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true')
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--interval', type=float)
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or get_option('POLL_INTERVAL')
+        while True:
+            sent, failed = deliver_pending(options['batch_size'])
+            if sent or failed or options['once']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Отправлено писем: {sent}, неудачных попыток: {failed}.'
+                ))
+            if options['once']:
+                return
+            connections.close_all()
+            time.sleep(interval)
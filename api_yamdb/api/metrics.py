@@ -0,0 +1,155 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    """Потокобезопасная гистограмма с набором меток в формате Prometheus."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = defaultdict(
+            lambda: [[0] * (len(buckets) + 1), 0.0, 0]
+        )
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, _, _ = series = self._series[labels]
+            counts[index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def collect(self):
+        with self._lock:
+            series = {
+                labels: (list(counts), total, count)
+                for labels, (counts, total, count) in self._series.items()
+            }
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        bounds = [repr(float(bound)) for bound in self.buckets] + ['+Inf']
+        for labels, (counts, total, count) in sorted(series.items()):
+            label_text = format_labels(labels)
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{label_text},le="{bound}"}} '
+                    f'{cumulative}'
+                )
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+def format_labels(labels):
+    return ','.join(f'{key}="{value}"' for key, value in labels)
+
+
+class Counter:
+    """Потокобезопасный счётчик с набором меток."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = defaultdict(int)
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] += amount
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def collect(self):
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} counter',
+        ] + [
+            f'{self.name}{{{format_labels(labels)}}} {value}'
+            for labels, value in sorted(values.items())
+        ]
+
+
+class Gauge:
+    """Значения, которые вычисляются функцией в момент сбора метрик."""
+
+    def __init__(self, name, documentation, get_values):
+        self.name = name
+        self.documentation = documentation
+        self.get_values = get_values
+
+    def collect(self):
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} gauge',
+        ] + [
+            f'{self.name}{{{format_labels(labels)}}} {value}'
+            for labels, value in sorted(self.get_values().items())
+        ]
+
+
+def mail_queue_depth():
+    from .mail import queue_depth
+
+    return queue_depth()
+
+
+REQUEST_DURATION = Histogram(
+    'api_request_duration_seconds',
+    'Время обработки запроса.',
+    DURATION_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'api_request_db_queries',
+    'Количество SQL-запросов на один запрос к API.',
+    QUERY_COUNT_BUCKETS,
+)
+DB_DURATION = Histogram(
+    'api_request_db_duration_seconds',
+    'Время выполнения SQL-запросов на один запрос к API.',
+    DURATION_BUCKETS,
+)
+HISTOGRAMS = (REQUEST_DURATION, DB_QUERIES, DB_DURATION)
+MAIL_DELIVERIES = Counter(
+    'api_mail_deliveries_total',
+    'Попытки доставки писем из очереди по результату.',
+)
+MAIL_QUEUE = Gauge(
+    'api_mail_queue_messages',
+    'Неотправленные письма в очереди: ожидающие и исчерпавшие попытки.',
+    mail_queue_depth,
+)
+
+
+def observe_request(route, method, duration, queries, db_duration):
+    labels = (('route', route), ('method', method))
+    REQUEST_DURATION.observe(labels, duration)
+    DB_QUERIES.observe(labels, queries)
+    DB_DURATION.observe(labels, db_duration)
+
+
+def render_metrics():
+    lines = []
+    for metric in (*HISTOGRAMS, MAIL_DELIVERIES, MAIL_QUEUE):
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import observe_request
+from .routers import (fail_replica, finish_reads, get_pin_key, is_pinned,
+                      pin_to_primary, start_reads)
+
+logger = logging.getLogger('api.metrics')
+
+# Счётчик SQL-запросов текущего запроса. Рабочие потоки асинхронных
+# обработчиков чтения получают его через контекст и подключают к своим
+# соединениям (см. api/async_views.py).
+current_recorder = ContextVar('query_recorder', default=None)
+
+
+class QueryRecorder:
+    """Обёртка `execute_wrapper`, считающая SQL-запросы и их время."""
+
+    def __init__(self, keep_sql):
+        self.keep_sql = keep_sql
+        self.count = 0
+        self.duration = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            if self.keep_sql:
+                self.queries.append((duration, sql))
+
+
+@contextmanager
+def record_queries(recorder):
+    """Подключает `recorder` ко всем соединениям текущего потока."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield
+
+
+def get_route(request):
+    """Имя маршрута: `Вьюсет.действие` для вьюсетов DRF или имя
+    функции-представления."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    actions = getattr(match.func, 'actions', None)
+    if actions:
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{match.func.cls.__name__}.{action}'
+    return match.func.__name__
+
+
+class MetricsMiddleware:
+    """Собирает по маршрутам гистограммы времени ответа, количества
+    и времени SQL-запросов; логирует медленные запросы вместе с SQL."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        slow_ms = settings.METRICS['SLOW_REQUEST_MS']
+        recorder = QueryRecorder(keep_sql=slow_ms is not None)
+        started = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            with record_queries(recorder):
+                response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        duration = time.perf_counter() - started
+        route = get_route(request)
+        observe_request(
+            route, request.method, duration, recorder.count,
+            recorder.duration
+        )
+        if slow_ms is not None and duration * 1000 >= slow_ms:
+            logger.warning(
+                'Медленный запрос %s %s (%s): %.1f мс, SQL-запросов: %d '
+                '(%.1f мс)\n%s',
+                request.method, request.get_full_path(), route,
+                duration * 1000, recorder.count, recorder.duration * 1000,
+                '\n'.join(
+                    f'  {query_duration * 1000:.1f} мс: {sql}'
+                    for query_duration, sql in recorder.queries
+                ),
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Разрешает безопасным запросам читать с реплик БД. После удачного
+    изменяющего запроса клиент READ_REPLICAS['PIN_SECONDS'] секунд
+    читает с основной БД. Запрос, чтение которого упало на реплике,
+    повторяется на основной БД."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = get_pin_key(request)
+        safe = request.method in SAFE_METHODS
+        token = start_reads(safe and not is_pinned(key))
+        try:
+            response = self.get_response(request)
+        finally:
+            finish_reads(token)
+        if not safe and response.status_code < 400:
+            pin_to_primary(key)
+        return response
+
+    def process_exception(self, request, exception):
+        """Повторяет безопасный запрос на основной БД, если чтение
+        с реплики завершилось ошибкой БД."""
+        if not isinstance(exception, DatabaseError) or not fail_replica(
+            exception
+        ):
+            return None
+        match = request.resolver_match
+        view = match.func
+        if asyncio.iscoroutinefunction(view):
+            view = async_to_sync(view)
+        return view(request, *match.args, **match.kwargs)
@@ -0,0 +1,33 @@
+from rest_framework.pagination import CursorPagination
+
+CURSOR_MODE = 'cursor'
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсорная пагинация по дате публикации: не выполняет COUNT(*)
+    и OFFSET, поэтому любая страница обходится так же, как первая."""
+
+    ordering = ('-pub_date', 'id')
+
+
+class OptionalCursorPaginationMixin:
+    """Включает курсорную пагинацию по параметру `?pagination=cursor`,
+    по умолчанию остаётся постраничная пагинация из настроек."""
+
+    cursor_pagination_class = PubDateCursorPagination
+
+    def use_cursor_pagination(self):
+        params = self.request.query_params
+        return (
+            params.get('pagination') == CURSOR_MODE
+            or self.cursor_pagination_class.cursor_query_param in params
+        )
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.use_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
@@ -1,5 +1,33 @@
 from rest_framework import permissions
 
+AUTHENTICATED = 'authenticated'
+MODERATE = 'moderate'
+ADMIN = 'admin'
+
+
+def get_capabilities(request):
+    """Возможности пользователя запроса. Роль разбирается один раз,
+    результат запоминается на запросе и общий для всех разрешений."""
+    try:
+        return request._capabilities
+    except AttributeError:
+        pass
+    user = request.user
+    capabilities = set()
+    if user and user.is_authenticated:
+        capabilities.add(AUTHENTICATED)
+        if user.is_admin:
+            capabilities.update((ADMIN, MODERATE))
+        elif user.is_moderator:
+            capabilities.add(MODERATE)
+    request._capabilities = frozenset(capabilities)
+    return request._capabilities
+
+
+def is_author(request, obj):
+    """Сравнивает идентификаторы, не загружая автора объекта."""
+    return obj.author_id == request.user.pk
+
 
 class AuthorOrModerOrAdmin(permissions.BasePermission):
     """Пользовательское разрешение, позволяющее выполнять действия,
@@ -7,11 +35,10 @@ class AuthorOrModerOrAdmin(permissions.BasePermission):
     являетесь автором объекта"""
 
     def has_permission(self, request, view):
-        return request.user.is_authenticated
+        return AUTHENTICATED in get_capabilities(request)
 
     def has_object_permission(self, request, view, obj):
-        return (request.user.is_moderator
-                or request.user.is_admin)
+        return MODERATE in get_capabilities(request)
 
 
 class IsAuthorAdminModeratorOrReadOnly(permissions.BasePermission):
@@ -21,15 +48,14 @@ class IsAuthorAdminModeratorOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
             request.method in permissions.SAFE_METHODS
-            or request.user.is_authenticated
+            or AUTHENTICATED in get_capabilities(request)
         )
 
     def has_object_permission(self, request, view, obj):
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
-            or request.user.is_admin
-            or request.user.is_moderator
+            or is_author(request, obj)
+            or MODERATE in get_capabilities(request)
         )
 
 
@@ -40,8 +66,7 @@ class IsAdminOrReadOnlyPermission(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
             request.method in permissions.SAFE_METHODS
-            or request.user.is_authenticated
-            and request.user.is_admin
+            or ADMIN in get_capabilities(request)
         )
 
 
@@ -50,4 +75,4 @@ class OnlyAdmin(permissions.BasePermission):
     только администратору"""
 
     def has_permission(self, request, view):
-        return request.user.is_authenticated and request.user.is_admin
+        return ADMIN in get_capabilities(request)
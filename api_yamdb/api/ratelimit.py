@@ -0,0 +1,184 @@
+"""Ограничение попыток получения JWT-токена.
+
+Неудачные попытки считаются в скользящем окне отдельно по username и по
+IP-адресу клиента. Проверка выполняется до обращения к БД, поэтому
+перебор кодов подтверждения не нагружает базу и не считает HMAC.
+Счётчики хранятся в памяти процесса; если задан
+TOKEN_RATE_LIMIT['CACHE_ALIAS'], — в общем кэше, чтобы лимит действовал
+для всех процессов приложения.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import caches
+from django.utils.http import base36_to_int
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+# Код состоит из метки времени в base36 и HMAC: 32 символа для sha256,
+# 20 — для кодов, выданных по старому алгоритму sha1.
+CODE_RE = re.compile(r'^([0-9a-z]{1,7})-([0-9a-f]{32}|[0-9a-f]{20})$')
+
+CLOCK_SKEW = 60
+
+
+class SlidingWindowLimiter:
+    """Не больше `limit` событий по ключу за последние `window` секунд.
+    Время событий хранится в памяти процесса."""
+
+    max_keys = 10000
+
+    def __init__(self, limit, window, clock=time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, events, now):
+        while events and events[0] <= now - self.window:
+            events.popleft()
+
+    def retry_after(self, key):
+        """Сколько секунд ждать до следующей попытки; None — можно сейчас."""
+        now = self.clock()
+        with self._lock:
+            events = self._events.get(key)
+            if not events:
+                return None
+            self._expire(events, now)
+            if len(events) < self.limit:
+                return None
+            return events[0] + self.window - now
+
+    def hit(self, key):
+        now = self.clock()
+        with self._lock:
+            if key not in self._events and len(self._events) >= self.max_keys:
+                self._prune(now)
+            events = self._events.setdefault(key, deque())
+            self._expire(events, now)
+            events.append(now)
+
+    def _prune(self, now):
+        for key in list(self._events):
+            self._expire(self._events[key], now)
+            if not self._events[key]:
+                del self._events[key]
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+
+class CacheSlidingWindowLimiter:
+    """Тот же лимит в общем кэше. Окно приближается счётчиками текущего и
+    предыдущего интервалов: вклад предыдущего убывает линейно."""
+
+    def __init__(self, limit, window, alias, clock=time.time):
+        self.limit = limit
+        self.window = window
+        self.cache = caches[alias]
+        self.clock = clock
+
+    def make_key(self, key, interval):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return f'token-attempts:{digest}:{interval}'
+
+    def retry_after(self, key):
+        now = self.clock()
+        interval, elapsed = divmod(now, self.window)
+        counts = self.cache.get_many([
+            self.make_key(key, interval - 1), self.make_key(key, interval)
+        ])
+        previous = counts.get(self.make_key(key, interval - 1), 0)
+        current = counts.get(self.make_key(key, interval), 0)
+        if previous * (1 - elapsed / self.window) + current < self.limit:
+            return None
+        return self.window - elapsed
+
+    def hit(self, key):
+        cache_key = self.make_key(key, self.clock() // self.window)
+        self.cache.add(cache_key, 0, timeout=2 * self.window)
+        try:
+            self.cache.incr(cache_key)
+        except ValueError:
+            self.cache.set(cache_key, 1, timeout=2 * self.window)
+
+    def clear(self):
+        pass
+
+
+_limiters = {}
+
+
+def get_limiter(scope):
+    """Лимитер для `USERNAME` или `IP` по текущим настройкам."""
+    options = settings.TOKEN_RATE_LIMIT
+    params = (
+        scope, options[f'{scope}_ATTEMPTS'], options['WINDOW'],
+        options['CACHE_ALIAS'],
+    )
+    if params not in _limiters:
+        limit, window, alias = params[1:]
+        _limiters[params] = (
+            CacheSlidingWindowLimiter(limit, window, alias) if alias
+            else SlidingWindowLimiter(limit, window)
+        )
+    return _limiters[params]
+
+
+def reset_limiters():
+    for limiter in _limiters.values():
+        limiter.clear()
+    _limiters.clear()
+
+
+def get_attempt_keys(request, username):
+    """Ключи лимитов. Адрес клиента определяется так же, как в
+    ограничителях частоты DRF (с учётом NUM_PROXIES)."""
+    return (
+        ('USERNAME', username),
+        ('IP', BaseThrottle().get_ident(request)),
+    )
+
+
+def check_token_attempts(request, username):
+    """Отклоняет запрос с кодом 429, если лимит неудачных попыток для
+    username или IP исчерпан."""
+    if not settings.TOKEN_RATE_LIMIT['ENABLED']:
+        return
+    waits = [
+        get_limiter(scope).retry_after(key)
+        for scope, key in get_attempt_keys(request, username)
+    ]
+    waits = [wait for wait in waits if wait is not None]
+    if waits:
+        raise Throttled(wait=max(waits))
+
+
+def register_token_failure(request, username):
+    if not settings.TOKEN_RATE_LIMIT['ENABLED']:
+        return
+    for scope, key in get_attempt_keys(request, username):
+        get_limiter(scope).hit(key)
+
+
+def is_plausible_code(code):
+    """Дешёвая проверка кода без обращения к БД: формат и срок действия
+    метки времени."""
+    match = CODE_RE.match(code)
+    if match is None:
+        return False
+    generator = default_token_generator
+    now = generator._num_seconds(generator._now())
+    timestamp = base36_to_int(match.group(1))
+    return (
+        now - settings.PASSWORD_RESET_TIMEOUT <= timestamp
+        <= now + CLOCK_SKEW
+    )
@@ -0,0 +1,89 @@
+"""JSON-рендерер и парсер на orjson с запасным вариантом на stdlib.
+
+Если orjson не установлен, классы ведут себя как стандартные
+`JSONRenderer`/`JSONParser` DRF. Ответ совпадает с ответом стандартного
+рендерера: компактный UTF-8, даты в ISO 8601 с `Z` для UTC,
+экранированные U+2028 и U+2029. Отступы для браузерного API и значения,
+которые orjson не умеет кодировать (например, целые больше 64 бит),
+отдаются стандартному рендереру.
+"""
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+def get_options():
+    return orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+
+    def __init__(self):
+        self.default = self.encoder_class().default
+
+    def dumps(self, data):
+        content = orjson.dumps(data, default=self.default,
+                               option=get_options())
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in content:
+                content = content.replace(separator, escaped)
+        return content
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type,
+                               renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        try:
+            return self.dumps(data)
+        except (TypeError, orjson.JSONEncodeError):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+
+    def iter_render(self, items, chunk_size=None):
+        """Кодирует список порциями: пиковая память не зависит от длины
+        списка. Отдаёт фрагменты одного JSON-массива."""
+        chunk_size = chunk_size or settings.JSON_STREAM_CHUNK_SIZE
+        yield b'['
+        for start in range(0, len(items), chunk_size):
+            chunk = self.render(list(items[start:start + chunk_size]))
+            yield (b',' if start else b'') + chunk[1:-1]
+        yield b']'
+
+
+def streaming_json_response(items, status):
+    """Ответ со списком, который кодируется порциями по мере отправки."""
+    return StreamingHttpResponse(
+        FastJSONRenderer().iter_render(items),
+        status=status,
+        content_type=FastJSONRenderer.media_type,
+    )
+
+
+class FastJSONParser(parsers.JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,182 @@
+"""Маршрутизация чтения на реплики БД.
+
+Реплики перечислены в READ_REPLICAS['ALIASES']. Чтение уходит на реплику
+только внутри безопасного запроса (GET, HEAD, OPTIONS), который пропустил
+ReplicaRoutingMiddleware; запись, чтение в транзакции и всё вне запросов
+(команды, сигналы миграций) работают с основной БД. Реплика выбирается
+один раз на запрос по кругу (round_robin) или по наименьшей задержке
+проверочного запроса (least_latency). Реплика, к которой не удалось
+подключиться или на которой чтение завершилось ошибкой БД, исключается
+на RETRY_SECONDS, и запрос читает со следующей реплики или с основной БД;
+упавшее представление повторяется на основной БД. Реплики открываются
+только для чтения (`mode=ro`): по ошибочному пути не создаётся пустой
+файл. Клиент, который только что записал данные,
+PIN_SECONDS читает с основной БД и видит свою запись. Ответы каталога,
+прочитанные с реплики в течение PIN_SECONDS после смены его поколения,
+не кэшируются.
+"""
+import hashlib
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger('api.routers')
+
+# Вес нового замера в скользящем среднем задержки реплики.
+LATENCY_WEIGHT = 0.3
+
+
+class ReadState:
+    __slots__ = ('alias',)
+
+    def __init__(self):
+        self.alias = None
+
+
+_read_state = ContextVar('replica_read_state', default=None)
+
+
+def get_option(name):
+    return settings.READ_REPLICAS[name]
+
+
+class ReplicaPool:
+    """Выбор реплики и учёт её состояния, общий для потоков процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counter = itertools.count()
+            self.latency = {}
+            self.down_until = {}
+
+    def ordered(self, aliases):
+        if get_option('STRATEGY') == 'least_latency':
+            return sorted(aliases, key=lambda alias: self.latency.get(
+                alias, 0.0
+            ))
+        start = next(self._counter) % len(aliases)
+        return aliases[start:] + aliases[:start]
+
+    def check(self, alias):
+        """Подключается к реплике, если соединения ещё нет, и замеряет
+        задержку проверочного запроса."""
+        connection = connections[alias]
+        if connection.connection is not None:
+            return True
+        started = time.perf_counter()
+        try:
+            connection.ensure_connection()
+            with connection.cursor() as cursor:
+                # Таблица миграций есть в любой рабочей копии БД: пустой
+                # или чужой файл отсеивается здесь, а не на чтении.
+                cursor.execute('SELECT 1 FROM django_migrations LIMIT 1')
+        except DatabaseError as error:
+            self.mark_down(alias, error)
+            return False
+        latency = time.perf_counter() - started
+        previous = self.latency.get(alias, latency)
+        self.latency[alias] = (
+            previous + LATENCY_WEIGHT * (latency - previous)
+        )
+        return True
+
+    def mark_down(self, alias, error):
+        logger.warning('Реплика %s недоступна: %s', alias, error)
+        connections[alias].close()
+        self.down_until[alias] = time.monotonic() + get_option('RETRY_SECONDS')
+
+    def choose(self):
+        now = time.monotonic()
+        aliases = [
+            alias for alias in get_option('ALIASES')
+            if self.down_until.get(alias, 0) <= now
+        ]
+        if not aliases:
+            return DEFAULT_DB_ALIAS
+        for alias in self.ordered(aliases):
+            if self.check(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+
+replica_pool = ReplicaPool()
+
+
+def start_reads(allowed):
+    """Разрешает текущему запросу читать с реплик. Возвращает токен для
+    `finish_reads`."""
+    return _read_state.set(ReadState() if allowed else None)
+
+
+def finish_reads(token):
+    _read_state.reset(token)
+
+
+def served_by_replica():
+    """Читал ли текущий запрос с реплики."""
+    state = _read_state.get()
+    return state is not None and state.alias not in (None, DEFAULT_DB_ALIAS)
+
+
+def fail_replica(error):
+    """Исключает реплику, на чтении с которой произошла ошибка, и
+    переводит остаток запроса на основную БД. Возвращает False, если
+    запрос читал не с реплики."""
+    if not served_by_replica():
+        return False
+    state = _read_state.get()
+    replica_pool.mark_down(state.alias, error)
+    state.alias = DEFAULT_DB_ALIAS
+    return True
+
+
+def get_pin_key(request):
+    """Ключ клиента без обращения к БД: заголовок авторизации или IP."""
+    client = request.META.get('HTTP_AUTHORIZATION') or (
+        'ip:' + request.META.get('REMOTE_ADDR', '')
+    )
+    return 'db-pin:' + hashlib.sha1(client.encode()).hexdigest()
+
+
+def get_pin_cache():
+    return caches[get_option('CACHE_ALIAS')]
+
+
+def pin_to_primary(key):
+    get_pin_cache().set(key, True, timeout=get_option('PIN_SECONDS'))
+
+
+def is_pinned(key):
+    return get_pin_cache().get(key, False)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        state = _read_state.get()
+        if state is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        if state.alias is None:
+            state.alias = replica_pool.choose()
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in get_option('ALIASES'):
+            return False
+        return None
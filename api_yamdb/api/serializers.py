@@ -1,7 +1,9 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from reviews.models import Category, Comment, Genre, Review, Title, User
 from reviews.validators import validate_username
+from .sparse import SparseFieldsSerializerMixin
 
 
 class SignUpSerializer(serializers.Serializer):
@@ -26,6 +28,21 @@ class JWTTokenSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(max_length=50)
 
 
+class TopTitlesQuerySerializer(serializers.Serializer):
+    """Параметры запроса рейтинга лучших произведений."""
+
+    genre = serializers.SlugField(required=False)
+    category = serializers.SlugField(required=False)
+    year = serializers.IntegerField(required=False)
+    min_reviews = serializers.IntegerField(min_value=1, default=1)
+    bayesian = serializers.BooleanField(default=False)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.LEADERBOARD['MAX_LIMIT'],
+        default=settings.LEADERBOARD['DEFAULT_LIMIT'],
+    )
+
+
 class GenreSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -40,7 +57,13 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
 
 
-class TitleListSerializer(serializers.ModelSerializer):
+def fast_rating(rating_sum, rating_count):
+    """Рейтинг для быстрого чтения: как `Title.rating` в IntegerField."""
+    return int(rating_sum / rating_count) if rating_count else None
+
+
+class TitleListSerializer(SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
     genre = GenreSerializer(
         read_only=True,
         many=True,
@@ -51,6 +74,17 @@ class TitleListSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(
         read_only=True,
     )
+    fast_fields = {
+        'rating': (('rating_sum', 'rating_count'), fast_rating),
+    }
+    slim_fields = {
+        'genre': lambda: serializers.SlugRelatedField(
+            slug_field='slug', many=True, read_only=True
+        ),
+        'category': lambda: serializers.SlugRelatedField(
+            slug_field='slug', read_only=True
+        ),
+    }
 
     class Meta:
         fields = [
@@ -77,7 +111,22 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleBulkItemSerializer(serializers.ModelSerializer):
+    """Проверка одного элемента пакетной записи произведений без
+    обращений к БД: slug-и жанров и категорий и идентификаторы
+    изменяемых произведений проверяются сразу для всей пачки."""
+
+    id = serializers.IntegerField(min_value=1, required=False)
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+    class Meta:
+        fields = ['id', 'name', 'year', 'description', 'genre', 'category']
+        model = Title
+
+
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -99,7 +148,20 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ReviewBulkItemSerializer(serializers.ModelSerializer):
+    """Проверка одного элемента пакетного создания отзывов без
+    обращений к БД: существование произведения и повторные отзывы
+    проверяются сразу для всей пачки."""
+
+    title = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        fields = ['title', 'text', 'score', ]
+        model = Review
+
+
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True,
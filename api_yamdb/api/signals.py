@@ -0,0 +1,42 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from reviews.models import Category, Genre, Review, Title, User
+from reviews.signals import bulk_data_changed
+from .authentication import invalidate_user_snapshot
+from .cache import bump_generation
+
+CATALOG_MODELS = (Category, Genre, Review, Title)
+
+
+def invalidate_catalog_cache(sender, **kwargs):
+    """Сбрасывает кэш каталога при изменении его данных."""
+    bump_generation()
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog_cache, sender=model)
+    post_delete.connect(invalidate_catalog_cache, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_catalog_cache_on_genre_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_generation()
+
+
+@receiver(post_migrate)
+@receiver(bulk_data_changed)
+def reset_catalog_cache(sender, **kwargs):
+    """После миграций, `flush` и массовых изменений в обход сигналов
+    моделей содержимое БД могло смениться целиком."""
+    bump_generation()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Сбрасывает закэшированного пользователя при изменении профиля,
+    роли или активности — через API, админку или ORM."""
+    invalidate_user_snapshot(instance.pk)
@@ -0,0 +1,68 @@
+"""Выборочные поля ответа: `?fields=` и `?expand=`.
+
+`?fields=id,name,rating` оставляет в ответе только перечисленные поля,
+а вьюсет читает из БД только нужные для них столбцы и связи.
+Связанные объекты в таком режиме отдаются slug-ами; вложенными
+объектами они остаются, если перечислены в `?expand=`. Без `?fields=`
+ответ не меняется.
+"""
+from rest_framework import permissions, serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def split_param(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_fields(request):
+    """Запрошенные поля и раскрываемые связи. Поля — None, если ответ
+    нужен целиком: параметр не передан или запрос изменяет данные."""
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None, set()
+    params = request.query_params
+    if FIELDS_PARAM not in params:
+        return None, set()
+    return (
+        split_param(params[FIELDS_PARAM]),
+        split_param(params.get(EXPAND_PARAM, '')),
+    )
+
+
+class SparseFieldsSerializerMixin:
+    """Убирает из сериализатора поля, не перечисленные в `?fields=`.
+    `slim_fields` — замены вложенных сериализаторов для режима без
+    раскрытия связей."""
+
+    slim_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = get_sparse_fields(self.context.get('request'))
+        if fields is None:
+            return
+        unknown = fields - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({
+                FIELDS_PARAM: [
+                    f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+                ]
+            })
+        for name in set(self.fields) - fields:
+            self.fields.pop(name)
+        for name, make_field in self.slim_fields.items():
+            if name in self.fields and name not in expand:
+                self.fields[name] = make_field()
+
+
+class SparseFieldsViewMixin:
+    """Сужает queryset вьюсета под `?fields=` для чтения. Вьюсет
+    реализует `get_sparse_queryset(queryset, fields, expand)`."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields, expand = get_sparse_fields(self.request)
+        if fields is None or self.action not in ('list', 'retrieve'):
+            return queryset
+        return self.get_sparse_queryset(queryset, fields, expand)
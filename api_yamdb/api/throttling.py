@@ -0,0 +1,133 @@
+"""Ограничение частоты запросов корзиной токенов в памяти процесса.
+
+Для каждой области из THROTTLE_RATES задаются скорость пополнения
+корзины (`число/период`, как в DRF) и её ёмкость — сколько запросов
+подряд можно сделать без пауз. Состояние корзин хранится в словаре
+процесса: проверка не ходит в кэш и стоит одно обращение к словарю под
+блокировкой. При нескольких процессах лимит действует в каждом
+отдельно.
+"""
+import math
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'30/min' -> токенов в секунду."""
+    number, period = rate.split('/')
+    return int(number) / PERIODS[period[0]]
+
+
+class TokenBucketStore:
+    """Корзины токенов по ключам. Запись хранит число токенов, время
+    обновления и время, к которому корзина снова заполнится: полные
+    корзины не отличаются от отсутствующих и удаляются при переполнении
+    словаря."""
+
+    max_keys = 100000
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst):
+        """Забирает токен. Возвращает None или сколько секунд ждать до
+        появления следующего токена."""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                tokens = burst
+            else:
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            if tokens < 1:
+                return (1 - tokens) / rate
+            tokens -= 1
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            return None
+
+    def _prune(self, now):
+        for key, bucket in list(self._buckets.items()):
+            if bucket[2] <= now:
+                del self._buckets[key]
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+bucket_store = TokenBucketStore()
+
+
+class BucketThrottle(BaseThrottle):
+    """Базовый класс: область `scope`, ключ — пользователь или IP.
+    `methods` ограничивает проверку безопасными (`read`) или
+    изменяющими (`write`) запросами."""
+
+    scope = None
+    methods = None
+    anonymous_only = False
+
+    def applies(self, request):
+        safe = request.method in SAFE_METHODS
+        if self.methods == 'read' and not safe:
+            return False
+        if self.methods == 'write' and safe:
+            return False
+        return not (
+            self.anonymous_only and request.user
+            and request.user.is_authenticated
+        )
+
+    def get_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'{self.scope}:user:{request.user.pk}'
+        return f'{self.scope}:ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        config = settings.THROTTLE_RATES.get(self.scope)
+        if config is None or not self.applies(request):
+            return True
+        rate, burst = config
+        self.retry_after = bucket_store.consume(
+            self.get_key(request), parse_rate(rate), burst
+        )
+        return self.retry_after is None
+
+    def wait(self):
+        return math.ceil(self.retry_after)
+
+
+class SignupThrottle(BucketThrottle):
+    scope = 'signup'
+
+
+class TokenThrottle(BucketThrottle):
+    scope = 'token'
+
+
+class ReviewWriteThrottle(BucketThrottle):
+    scope = 'review-write'
+    methods = 'write'
+
+
+class CommentWriteThrottle(BucketThrottle):
+    scope = 'comment-write'
+    methods = 'write'
+
+
+class AnonReadThrottle(BucketThrottle):
+    scope = 'anon-read'
+    methods = 'read'
+    anonymous_only = True
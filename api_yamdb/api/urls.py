@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework import routers
 
+from .async_views import with_async_reads
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, signup_function,
+                    ReviewViewSet, TitleViewSet, UserViewSet,
+                    bulk_reviews_function, search_function, signup_function,
                     token_function)
 
 router_v1 = routers.DefaultRouter()
@@ -22,8 +25,14 @@ router_v1.register(
     basename='comments'
 )
 
+router_v1_urls = router_v1.urls
+if settings.ASYNC_READ_VIEWS:
+    router_v1_urls = with_async_reads(router_v1_urls)
+
 urlpatterns = [
-    path('v1/', include(router_v1.urls)),
+    path('v1/', include(router_v1_urls)),
     path('v1/auth/signup/', signup_function, name='signup'),
     path('v1/auth/token/', token_function, name='token'),
+    path('v1/reviews/bulk/', bulk_reviews_function, name='reviews-bulk'),
+    path('v1/search/', search_function, name='search'),
 ]
@@ -1,25 +1,43 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, permissions, status, viewsets
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.leaderboards import top_title_ids
+from reviews.models import (SCORE_RANGE, Category, Comment, Genre, Review,
+                            Title, User, score_field_name)
+from reviews.ratings import score_stats
+from reviews.search import KIND_CODES, search
+from .bulk import create_reviews, save_titles
+from .cache import CatalogCacheMixin
+from .fast import FastListMixin
 from .filters import TitleFilter
+from .mail import enqueue_mail
+from .metrics import render_metrics
+from .pagination import OptionalCursorPaginationMixin
+from .ratelimit import (check_token_attempts, is_plausible_code,
+                        register_token_failure)
 from .permissions import (IsAdminOrReadOnlyPermission,
                           IsAuthorAdminModeratorOrReadOnly, OnlyAdmin)
+from .renderers import streaming_json_response
 from .serializers import (CategorySerializer, CommentSerializer,
                           GenreSerializer, JWTTokenSerializer,
                           ReviewSerializer, SignUpSerializer,
                           TitleCreateSerializer, TitleListSerializer,
-                          UserSerializer)
+                          TopTitlesQuerySerializer, UserSerializer)
+from .sparse import SparseFieldsViewMixin
+from .throttling import (AnonReadThrottle, CommentWriteThrottle,
+                         ReviewWriteThrottle, SignupThrottle, TokenThrottle)
 
 
 class CreateListDestroyViewSet(
@@ -31,7 +49,11 @@ class CreateListDestroyViewSet(
     pass
 
 
+CONFIRMATION_SUBJECT = 'Код подтверждения YaMDb'
+
+
 @api_view(['POST'])
+@throttle_classes((SignupThrottle,))
 def signup_function(request):
     """Функция для регистрации нового пользователя"""
 
@@ -49,29 +71,116 @@ def signup_function(request):
             status=status.HTTP_400_BAD_REQUEST)
     code = default_token_generator.make_token(user)
     message = f'Здравствуйте, {username}! Ваш код подтверждения: {code}'
-    send_mail(_, message, settings.EMAIL_ADMIN, [email])
+    enqueue_mail(CONFIRMATION_SUBJECT, message, email)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
+@throttle_classes((TokenThrottle,))
 def token_function(request):
     """Функция для получения JWT-токена"""
 
     serializer = JWTTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data.get('username')
-    user = get_object_or_404(User, username=username)
-    if default_token_generator.check_token(
-        user,
-        serializer.validated_data['confirmation_code']
-    ):
+    code = serializer.validated_data['confirmation_code']
+    check_token_attempts(request, username)
+    if is_plausible_code(code):
+        user = User.objects.filter(username=username).first()
+        found = user is not None
+        valid = found and default_token_generator.check_token(user, code)
+    else:
+        found = User.objects.filter(username=username).exists()
+        valid = False
+    if valid:
         return Response(
             {'token': str(AccessToken.for_user(user))},
             status=status.HTTP_201_CREATED)
+    register_token_failure(request, username)
+    if not found:
+        raise Http404
     return Response(serializer.validated_data,
                     status=status.HTTP_400_BAD_REQUEST)
 
 
+def bulk_items_error(items, max_items, name):
+    """Ошибка, если тело пакетного запроса — не список допустимой длины."""
+    if isinstance(items, list) and 0 < len(items) <= max_items:
+        return None
+    return Response(
+        f'Ожидается непустой список не более чем из {max_items} {name}.',
+        status=status.HTTP_400_BAD_REQUEST)
+
+
+def bulk_results_response(results):
+    """Ответ пакетной записи: 201, если что-то создано, 200, если только
+    изменено, иначе 400. Длинные списки результатов отдаются потоком."""
+    statuses = {result['status'] for result in results}
+    if status.HTTP_201_CREATED in statuses:
+        code = status.HTTP_201_CREATED
+    elif status.HTTP_200_OK in statuses:
+        code = status.HTTP_200_OK
+    else:
+        code = status.HTTP_400_BAD_REQUEST
+    if len(results) > settings.JSON_STREAM_CHUNK_SIZE:
+        return streaming_json_response(results, code)
+    return Response(results, status=code)
+
+
+def bulk_reviews_response(author, items):
+    """Создаёт отзывы пачкой и отвечает результатами по каждому элементу"""
+
+    error = bulk_items_error(
+        items, settings.REVIEWS_BULK_MAX_ITEMS, 'отзывов'
+    )
+    if error:
+        return error
+    try:
+        results = create_reviews(author, items)
+    except IntegrityError:
+        return Response(
+            'Отзывы на некоторые произведения уже созданы, '
+            'повторите запрос.',
+            status=status.HTTP_409_CONFLICT)
+    return bulk_results_response(results)
+
+
+@api_view(['POST'])
+@permission_classes((IsAuthenticated,))
+@throttle_classes((ReviewWriteThrottle,))
+def bulk_reviews_function(request):
+    """Функция для пакетного создания отзывов на разные произведения"""
+
+    return bulk_reviews_response(request.user, request.data)
+
+
+@api_view(['GET'])
+def search_function(request):
+    """Функция полнотекстового поиска по произведениям, отзывам
+    и комментариям"""
+
+    kind = request.query_params.get('type')
+    if kind is not None and kind not in KIND_CODES:
+        return Response(
+            f'Параметр type принимает значения: {", ".join(KIND_CODES)}.',
+            status=status.HTTP_400_BAD_REQUEST)
+    paginator = PageNumberPagination()
+    page = paginator.paginate_queryset(
+        search(request.query_params.get('q', ''), kind), request
+    )
+    return paginator.get_paginated_response(page)
+
+
+def metrics_function(request):
+    """Метрики запросов в текстовом формате Prometheus"""
+
+    if not settings.METRICS['ENABLED']:
+        raise Http404
+    return HttpResponse(
+        render_metrics(),
+        content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """Вьюсет для получения, обновления и удаления информации
     о пользователях"""
@@ -108,15 +217,87 @@ class GetPostPatchDeleteViewSet(viewsets.ModelViewSet):
     http_method_names = ('get', 'post', 'patch', 'delete')
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(CatalogCacheMixin, FastListMixin, SparseFieldsViewMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
     permission_classes = (IsAdminOrReadOnlyPermission,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
 
-    def get_queryset(self):
-        return Title.objects.all().annotate(
-            rating=Avg('reviews__score')
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    @action(detail=False, methods=('post',), url_path='bulk')
+    def bulk(self, request):
+        """Пакетное создание и изменение произведений."""
+        error = bulk_items_error(
+            request.data, settings.TITLES_BULK_MAX_ITEMS, 'произведений'
+        )
+        if error:
+            return error
+        return bulk_results_response(save_titles(request.data))
+
+    def get_sparse_queryset(self, queryset, fields, expand):
+        columns = {'id'} | (fields & {'name', 'year', 'description'})
+        if 'rating' in fields:
+            columns.update(('rating_sum', 'rating_count'))
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if 'category' in fields:
+            columns.update(('category', 'category__slug'))
+            if 'category' in expand:
+                columns.add('category__name')
+            queryset = queryset.select_related('category')
+        if 'genre' in fields:
+            genre_columns = ('slug', 'name') if 'genre' in expand else (
+                'slug',
+            )
+            queryset = queryset.prefetch_related(Prefetch(
+                'genre', queryset=Genre.objects.only(*genre_columns)
+            ))
+        return queryset.only(*columns)
+
+    @action(detail=True, methods=('get',), url_path='stats')
+    def stats(self, request, pk=None):
+        """Распределение оценок произведения и статистика по нему."""
+        title = get_object_or_404(Title.objects.only(
+            *(score_field_name(score) for score in SCORE_RANGE)
+        ), pk=pk)
+        return Response(score_stats(title.score_histogram))
+
+    @action(detail=False, methods=('get',), url_path='top')
+    def top(self, request):
+        """Лучшие произведения по рейтингу, в том числе внутри жанра
+        или категории. Читается из материализованных рейтингов."""
+        return self.get_cached_response(self.get_top, request)
+
+    def get_top(self, request):
+        params = TopTitlesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+        scopes = {}
+        for name, model in (('genre', Genre), ('category', Category)):
+            if name in params:
+                scopes[f'{name}_id'] = model.objects.filter(
+                    slug=params[name]
+                ).values_list('pk', flat=True).first()
+                if scopes[f'{name}_id'] is None:
+                    return Response([])
+        title_ids = top_title_ids(
+            year=params.get('year'),
+            min_reviews=params['min_reviews'],
+            bayesian=params['bayesian'],
+            limit=params['limit'],
+            **scopes,
         )
+        titles = self.get_queryset().in_bulk(title_ids)
+        serializer = TitleListSerializer(
+            [titles[pk] for pk in title_ids if pk in titles], many=True
+        )
+        return Response(serializer.data)
 
     def get_serializer_class(self):
         if self.request.method in permissions.SAFE_METHODS:
@@ -124,7 +305,7 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleCreateSerializer
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(CatalogCacheMixin, CreateListDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnlyPermission,)
@@ -133,7 +314,7 @@ class GenreViewSet(CreateListDestroyViewSet):
     search_fields = ('name',)
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(CatalogCacheMixin, CreateListDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnlyPermission,)
@@ -142,11 +323,23 @@ class CategoryViewSet(CreateListDestroyViewSet):
     search_fields = ('name',)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+def only_authored_columns(queryset, fields, columns):
+    """Столбцы отзыва или комментария для `?fields=`; дата публикации
+    нужна курсорной пагинации всегда."""
+    columns = {'id', 'pub_date'} | (fields & columns)
+    if 'author' not in fields:
+        return queryset.select_related(None).only(*columns)
+    columns.update(('author', 'author__username'))
+    return queryset.select_related('author').only(*columns)
+
+
+class ReviewViewSet(OptionalCursorPaginationMixin, FastListMixin,
+                    SparseFieldsViewMixin, viewsets.ModelViewSet):
     """Вьюсет для модели Review. """
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthorAdminModeratorOrReadOnly, ]
+    throttle_classes = (AnonReadThrottle, ReviewWriteThrottle)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
     def get_title(self):
@@ -161,22 +354,65 @@ class ReviewViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Review.objects.filter(title=self.get_title())
 
+    def get_sparse_queryset(self, queryset, fields, expand):
+        return only_authored_columns(queryset, fields, {'text', 'score'})
 
-class CommentViewSet(viewsets.ModelViewSet):
+    @action(
+        detail=False,
+        methods=('post',),
+        url_path='bulk',
+        permission_classes=(IsAuthenticated,)
+    )
+    def bulk(self, request, title_id):
+        """Пакетное создание отзывов на произведение."""
+        title = self.get_title()
+        items = request.data
+        if isinstance(items, list):
+            items = [
+                {**item, 'title': title.pk} if isinstance(item, dict)
+                else item
+                for item in items
+            ]
+        return bulk_reviews_response(request.user, items)
+
+
+class CommentViewSet(OptionalCursorPaginationMixin, FastListMixin,
+                     SparseFieldsViewMixin, viewsets.ModelViewSet):
     """Вьюсет для модели Comment. """
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = [IsAuthorAdminModeratorOrReadOnly, ]
+    throttle_classes = (AnonReadThrottle, CommentWriteThrottle)
 
     def get_review(self):
-        return get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title=self.kwargs.get('title_id'))
+        """Отзыв из адреса. Пара (title_id, review_id) проверяется одним
+        запросом, отзыв запоминается на время запроса."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('id', 'title_id'),
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'))
+        return self._review
 
     def get_queryset(self):
-        return Comment.objects.filter(review=self.get_review())
+        # Соединение с отзывом проверяет пару из адреса в том же запросе,
+        # что и выборка комментариев.
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ).select_related('author')
+
+    def paginate_queryset(self, queryset):
+        """Пустая страница может означать неверный адрес: отзыв
+        проверяется отдельным запросом только в этом случае."""
+        page = super().paginate_queryset(queryset)
+        if page is not None and not page:
+            self.get_review()
+        return page
+
+    def get_sparse_queryset(self, queryset, fields, expand):
+        return only_authored_columns(queryset, fields, {'text'})
 
     def perform_create(self, serializer):
         serializer.save(
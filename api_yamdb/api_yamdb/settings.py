@@ -39,6 +39,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Сбор метрик запросов: гистограммы доступны по адресу /metrics/,
+# запросы дольше SLOW_REQUEST_MS логируются вместе с SQL (None — не логировать).
+METRICS = {
+    'ENABLED': False,
+    'SLOW_REQUEST_MS': 500,
+}
+
+if METRICS['ENABLED']:
+    MIDDLEWARE.insert(0, 'api.middleware.MetricsMiddleware')
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -60,9 +70,22 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# Асинхронные обработчики чтения каталога и отзывов под ASGI. По умолчанию
+# выключены: на benchmarks/bench_asgi.py они не быстрее синхронных вьюсетов.
+# MetricsMiddleware и ReplicaRoutingMiddleware только синхронные: с любой из
+# них Django выполняет цепочку обработчиков синхронно, и обёртка ничего
+# не даёт.
+ASYNC_READ_VIEWS = os.environ.get('API_ASYNC_READ_VIEWS') == '1'
+
 
 # Database
 
+# Профиль БД: sqlite — настройки SQLite по умолчанию, sqlite-prod — WAL,
+# транзакции BEGIN IMMEDIATE с ожиданием блокировок вместо ошибки,
+# постоянные соединения и прагмы OPTIONS['pragmas'], которые бэкенд
+# выполняет один раз для нового соединения.
+DATABASE_PROFILE = os.environ.get('API_DATABASE_PROFILE', 'sqlite')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -70,6 +93,73 @@ DATABASES = {
     }
 }
 
+if DATABASE_PROFILE == 'sqlite-prod':
+    DATABASES['default'].update({
+        'ENGINE': 'api_yamdb.sqlite',
+        'CONN_MAX_AGE': int(os.environ.get('API_CONN_MAX_AGE', 600)),
+        'OPTIONS': {
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 20000,
+                'cache_size': -65536,
+                'mmap_size': 268435456,
+                'temp_store': 'MEMORY',
+            },
+        },
+    })
+
+# Реплики для чтения: пути к файлам SQLite через запятую. На реплики
+# уходит чтение безопасных запросов (см. api/routers.py); STRATEGY —
+# round_robin или least_latency. Реплики открываются только для чтения:
+# отсутствующий файл — ошибка подключения, а не новая пустая БД.
+for index, name in enumerate(filter(None, os.environ.get(
+    'API_DATABASE_REPLICAS', ''
+).split(','))):
+    DATABASES[f'replica_{index + 1}'] = {
+        **DATABASES['default'],
+        'NAME': f'file:{name}?mode=ro',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+READ_REPLICAS = {
+    'ALIASES': [alias for alias in DATABASES if alias != 'default'],
+    'STRATEGY': os.environ.get('API_REPLICA_STRATEGY', 'round_robin'),
+    'PIN_SECONDS': 5,
+    'RETRY_SECONDS': 30,
+    'CACHE_ALIAS': 'default',
+}
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+if READ_REPLICAS['ALIASES']:
+    MIDDLEWARE.append('api.middleware.ReplicaRoutingMiddleware')
+
+# Cache
+
+# Для нескольких процессов без внешних сервисов подойдёт файловый бэкенд:
+# 'django.core.cache.backends.filebased.FileBasedCache' с 'LOCATION'
+# в общем каталоге.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+    }
+}
+
+CATALOG_CACHE_ALIAS = 'default'
+
+CATALOG_CACHE_TIMEOUT = 300
+
+# Кэш пользователей JWT-аутентификации. Сигналы сбрасывают запись только
+# в кэше процесса, изменившего пользователя: при нескольких процессах
+# с LocMemCache понижение роли или блокировка в остальных процессах
+# вступают в силу лишь через AUTH_USER_CACHE_TIMEOUT секунд. Для
+# нескольких процессов нужен общий кэш (например, файловый, см. выше).
+AUTH_USER_CACHE_ALIAS = 'default'
+
+AUTH_USER_CACHE_TIMEOUT = 60
+
 
 # Password validation
 
@@ -112,20 +202,86 @@ AUTH_USER_MODEL = 'reviews.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ),
+
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+
+    'DEFAULT_THROTTLE_CLASSES': (
+        'api.throttling.AnonReadThrottle',
     ),
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
 
+# Ограничение частоты запросов по областям (api/throttling.py): скорость
+# пополнения корзины токенов и её ёмкость; области без записи
+# не ограничиваются.
+THROTTLE_RATES = {
+    'signup': ('10/hour', 5),
+    'token': ('30/min', 10),
+    'review-write': ('30/min', 10),
+    'comment-write': ('60/min', 20),
+    'anon-read': ('600/min', 100),
+}
+
+REVIEWS_BULK_MAX_ITEMS = 1000
+TITLES_BULK_MAX_ITEMS = 1000
+
+# Ответы-списки длиннее порции кодируются и отдаются потоком.
+JSON_STREAM_CHUNK_SIZE = 200
+
+# Списки произведений, отзывов и комментариев читаются через `.values()`
+# без экземпляров моделей и сериализаторов DRF (см. api/fast.py).
+FAST_READ_SERIALIZERS = (
+    os.environ.get('API_FAST_READ_SERIALIZERS', '1') == '1'
+)
+
+# Вес априорного среднего в байесовском рейтинге: столько «средних»
+# оценок добавляется к оценкам каждого произведения.
+LEADERBOARD = {
+    'PRIOR_WEIGHT': 10,
+    'DEFAULT_LIMIT': 10,
+    'MAX_LIMIT': 100,
+}
+
 SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
 }
 
+# Лимит неудачных попыток получения токена за WINDOW секунд. Счётчики
+# хранятся в памяти процесса или в кэше CACHE_ALIAS.
+TOKEN_RATE_LIMIT = {
+    'ENABLED': True,
+    'WINDOW': 300,
+    'USERNAME_ATTEMPTS': 5,
+    'IP_ATTEMPTS': 50,
+    'CACHE_ALIAS': os.environ.get('API_TOKEN_RATE_LIMIT_CACHE') or None,
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 EMAIL_ADMIN = 'skrill96@e1.ru'
+
+# Очередь исходящих писем: обработчик thread, command или sync.
+MAIL_QUEUE = {
+    'WORKER': os.environ.get('API_MAIL_WORKER', 'thread'),
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 30,
+    'MAX_RETRY_DELAY': 3600,
+    'LEASE': 300,
+    'POLL_INTERVAL': 5,
+}
@@ -0,0 +1,32 @@
+"""Бэкенд SQLite профиля sqlite-prod.
+
+Транзакции начинаются с BEGIN IMMEDIATE: блокировка записи берётся в
+начале транзакции, и конкурирующий писатель ждёт её в пределах
+busy_timeout. С обычным BEGIN транзакция, которая сначала читает, а
+потом пишет, сразу получает `database is locked`, если другой писатель
+успел раньше.
+
+Прагмы из OPTIONS['pragmas'] выполняются один раз для нового
+соединения: постоянные соединения (CONN_MAX_AGE) не настраиваются
+заново на каждый запрос.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Не параметр sqlite3.connect: применяется в get_new_connection.
+        params.pop('pragmas', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        pragmas = self.settings_dict['OPTIONS'].get('pragmas', {})
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
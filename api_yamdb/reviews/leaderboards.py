@@ -0,0 +1,229 @@
+"""Материализованные рейтинги лучших произведений.
+
+Для каждого произведения хранится строка в общем рейтинге, в рейтинге
+его категории и в рейтинге каждого его жанра. Изменения оценок
+применяются к строкам одним UPDATE, поэтому первые N мест читаются
+по индексу. Байесовский рейтинг
+    (сумма оценок + C * m) / (количество оценок + C)
+использует априорное среднее m, которое фиксируется при уплотнении
+(`compact_leaderboards`): до следующего уплотнения строки обновляются
+с текущим m.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import (Case, F, FloatField, IntegerField, Q, Sum,
+                              Value, When)
+from django.db.models.functions import Cast, NullIf
+
+from .models import MAX_SCORE, MIN_SCORE, LeaderboardEntry, Title
+
+PRIOR_MEAN_KEY = 'leaderboard:prior_mean'
+
+
+def get_prior():
+    """Вес C и априорное среднее m байесовского рейтинга."""
+    mean = cache.get(PRIOR_MEAN_KEY)
+    if mean is None:
+        totals = Title.objects.aggregate(
+            score_sum=Sum('rating_sum'), count=Sum('rating_count')
+        )
+        mean = (
+            totals['score_sum'] / totals['count'] if totals['count']
+            else (MIN_SCORE + MAX_SCORE) / 2
+        )
+        cache.set(PRIOR_MEAN_KEY, mean, timeout=None)
+    return settings.LEADERBOARD['PRIOR_WEIGHT'], mean
+
+
+def rating_expressions(score_delta=0, count_delta=0):
+    weight, mean = get_prior()
+    score_sum = Cast(F('rating_sum') + score_delta, FloatField())
+    count = F('rating_count') + count_delta
+    return {
+        'rating_sum': F('rating_sum') + score_delta,
+        'rating_count': count,
+        'rating': score_sum / NullIf(count, 0),
+        'bayesian_rating': (score_sum + weight * mean) / (count + weight),
+    }
+
+
+def apply_score_delta(title_id, score_delta, count_delta):
+    LeaderboardEntry.objects.filter(title_id=title_id).update(
+        **rating_expressions(score_delta, count_delta)
+    )
+
+
+def delta_case(deltas, field='pk'):
+    """Приращение по идентификатору произведения одним выражением CASE:
+    пачка произведений обновляется одним UPDATE."""
+    return Case(
+        *(
+            When(**{field: title_id}, then=Value(delta))
+            for title_id, delta in deltas.items() if delta
+        ),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def apply_score_deltas(score_deltas, count_deltas):
+    """То же, что `apply_score_delta`, для пачки произведений."""
+    LeaderboardEntry.objects.filter(title_id__in=score_deltas).update(
+        **rating_expressions(
+            delta_case(score_deltas, 'title_id'),
+            delta_case(count_deltas, 'title_id'),
+        )
+    )
+
+
+def sync_title(title_id):
+    """Приводит набор строк произведения в рейтингах к его текущим
+    категории и жанрам."""
+    title = Title.objects.filter(pk=title_id).values(
+        'category_id', 'year', 'rating_sum', 'rating_count'
+    ).first()
+    if title is None:
+        return
+    scopes = {(LeaderboardEntry.ALL, 0)}
+    if title['category_id']:
+        scopes.add((LeaderboardEntry.CATEGORY, title['category_id']))
+    scopes.update(
+        (LeaderboardEntry.GENRE, genre_id)
+        for genre_id in Title.genre.through.objects.filter(
+            title_id=title_id
+        ).values_list('genre_id', flat=True)
+    )
+    entries = LeaderboardEntry.objects.filter(title_id=title_id)
+    existing = set(entries.values_list('scope', 'scope_id'))
+    stale = existing - scopes
+    if stale:
+        condition = Q()
+        for scope, scope_id in stale:
+            condition |= Q(scope=scope, scope_id=scope_id)
+        entries.filter(condition).delete()
+    weight, mean = get_prior()
+    values = {
+        'title_category_id': title['category_id'],
+        'year': title['year'],
+        'rating_sum': title['rating_sum'],
+        'rating_count': title['rating_count'],
+        'rating': (
+            title['rating_sum'] / title['rating_count']
+            if title['rating_count'] else None
+        ),
+        'bayesian_rating': (
+            (title['rating_sum'] + weight * mean)
+            / (title['rating_count'] + weight)
+        ),
+    }
+    entries.update(**values)
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(
+                scope=scope, scope_id=scope_id, title_id=title_id, **values
+            )
+            for scope, scope_id in scopes - existing
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def get_compact_sql(weight, mean, title_ids=None):
+    """SQL перестроения рейтингов по сохранённой статистике произведений
+    `title_ids` (по умолчанию — всех): список пар (запрос, параметры)."""
+    entries = LeaderboardEntry._meta.db_table
+    titles = Title._meta.db_table
+    genres = Title.genre.through._meta.db_table
+    insert = (
+        f'INSERT INTO {entries} (scope, scope_id, title_id, '
+        'title_category_id, year, rating_sum, rating_count, rating, '
+        'bayesian_rating) '
+    )
+    values = (
+        't.id, t.category_id, t.year, t.rating_sum, t.rating_count, '
+        'CASE WHEN t.rating_count > 0 '
+        'THEN t.rating_sum * 1.0 / t.rating_count END, '
+        '(t.rating_sum + %s) * 1.0 / (t.rating_count + %s)'
+    )
+    params = [weight * mean, weight]
+    ids = [] if title_ids is None else list(title_ids)
+    in_ids = f'IN ({", ".join(["%s"] * len(ids))})'
+    only_titles = '' if title_ids is None else f' WHERE t.id {in_ids}'
+    and_titles = '' if title_ids is None else f' AND t.id {in_ids}'
+    delete = f'DELETE FROM {entries}'
+    if title_ids is not None:
+        delete += f' WHERE title_id {in_ids}'
+    return [
+        (delete, ids),
+        (
+            f"{insert}SELECT '{LeaderboardEntry.ALL}', 0, {values} "
+            f'FROM {titles} t{only_titles}',
+            params + ids,
+        ),
+        (
+            f"{insert}SELECT '{LeaderboardEntry.CATEGORY}', t.category_id, "
+            f'{values} FROM {titles} t WHERE t.category_id IS NOT NULL'
+            f'{and_titles}',
+            params + ids,
+        ),
+        (
+            f"{insert}SELECT '{LeaderboardEntry.GENRE}', g.genre_id, "
+            f'{values} FROM {titles} t JOIN {genres} g ON g.title_id = t.id'
+            f'{only_titles}',
+            params + ids,
+        ),
+    ]
+
+
+def compact(using='default'):
+    """Перестраивает все рейтинги с новым априорным средним."""
+    cache.delete(PRIOR_MEAN_KEY)
+    weight, mean = get_prior()
+    with transaction.atomic(using=using), \
+            connections[using].cursor() as cursor:
+        for statement, params in get_compact_sql(weight, mean):
+            cursor.execute(statement, params)
+
+
+def sync_titles(title_ids, using='default', batch_size=500):
+    """Пересобирает строки рейтингов пачки произведений, созданных или
+    изменённых в обход сигналов, несколькими запросами на пачку."""
+    title_ids = list(title_ids)
+    weight, mean = get_prior()
+    with transaction.atomic(using=using), \
+            connections[using].cursor() as cursor:
+        for start in range(0, len(title_ids), batch_size):
+            for statement, params in get_compact_sql(
+                weight, mean, title_ids[start:start + batch_size]
+            ):
+                cursor.execute(statement, params)
+
+
+def top_title_ids(genre_id=None, category_id=None, year=None,
+                  min_reviews=1, bayesian=False, limit=10):
+    """Идентификаторы лучших произведений в порядке убывания рейтинга."""
+    if genre_id is not None:
+        entries = LeaderboardEntry.objects.filter(
+            scope=LeaderboardEntry.GENRE, scope_id=genre_id
+        )
+        if category_id is not None:
+            entries = entries.filter(title_category_id=category_id)
+    elif category_id is not None:
+        entries = LeaderboardEntry.objects.filter(
+            scope=LeaderboardEntry.CATEGORY, scope_id=category_id
+        )
+    else:
+        entries = LeaderboardEntry.objects.filter(
+            scope=LeaderboardEntry.ALL, scope_id=0
+        )
+    if year is not None:
+        entries = entries.filter(year=year)
+    order = '-bayesian_rating' if bayesian else '-rating'
+    return list(
+        entries.filter(
+            rating_count__gte=max(min_reviews, 1)
+        ).order_by(order, 'title_id').values_list('title_id', flat=True)[
+            :limit
+        ]
+    )
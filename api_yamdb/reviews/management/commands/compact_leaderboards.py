@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboards import compact, get_prior
+from reviews.signals import bulk_data_changed
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает рейтинги лучших произведений и обновляет '
+        'априорное среднее байесовского рейтинга.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        compact()
+        bulk_data_changed.send(sender=self.__class__)
+        weight, mean = get_prior()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги перестроены за {time.monotonic() - started:.2f} с, '
+            f'априорное среднее {mean:.2f}, вес {weight}.'
+        ))
@@ -1,9 +1,17 @@
 import csv
+import os
+import time
+from itertools import islice
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
+from reviews.leaderboards import compact
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.ratings import recompute_ratings
+from reviews.search import mark_stale
+from reviews.signals import bulk_data_changed
 
 MODELS_DATA = {
     User: 'users.csv',
@@ -12,31 +20,77 @@ MODELS_DATA = {
     Title: 'titles.csv',
     Review: 'review.csv',
     Comment: 'comments.csv',
+    Title.genre.through: 'genre_title.csv',
 }
 
 CSV_PATH = f'{settings.BASE_DIR}/static/data/'
 
+BATCH_SIZE = 5000
+
+
+def read_chunks(path, chunk_size):
+    """Построчно читает CSV-файл и отдаёт строки порциями."""
+    with open(path, 'r', newline='') as file:
+        reader = csv.DictReader(file)
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
 
 class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов в БД порциями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=CSV_PATH,
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк в одной транзакции и одном INSERT.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Пропускать уже загруженные строки вместо ошибки.',
+        )
+
+    def import_file(self, model, path, batch_size, resume):
+        started = time.monotonic()
+        total = 0
+        for chunk in read_chunks(path, batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    (model(**row) for row in chunk),
+                    batch_size=batch_size,
+                    ignore_conflicts=resume,
+                )
+            total += len(chunk)
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'{model._meta.db_table}: {total} строк, '
+                f'{total / elapsed if elapsed else total:.0f} строк/с'
+            )
+        return total
 
     def handle(self, *args, **options):
         for model, csv_f in MODELS_DATA.items():
-            with open(
-                str(CSV_PATH) + csv_f, 'r', newline=''
-            ) as file:
-                reader = csv.DictReader(file)
-                records = []
-                for row in reader:
-                    records.append(model(**row))
-            model.objects.bulk_create(records)
-
-        with open(
-            str(CSV_PATH) + 'genre_title.csv', 'r', newline=''
-        ) as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                title = Title.objects.get(id=row['title_id'])
-                title.genre.add(row['genre_id'])
+            self.import_file(
+                model,
+                os.path.join(options['path'], csv_f),
+                options['batch_size'],
+                options['resume'],
+            )
+
+        recompute_ratings()
+        compact()
+        mark_stale()
+        bulk_data_changed.send(sender=self.__class__)
 
         self.stdout.write(self.style.SUCCESS(
             'Данные успешно загружены.'
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает индекс полнотекстового поиска.'
+
+    def handle(self, *args, **options):
+        rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            'Индекс поиска перестроен.'
+        ))
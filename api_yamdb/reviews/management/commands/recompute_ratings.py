@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from reviews.leaderboards import compact
+from reviews.ratings import recompute_ratings
+from reviews.signals import bulk_data_changed
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённые рейтинги произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        updated = recompute_ratings()
+        compact()
+        bulk_data_changed.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересчитаны для {updated} произведений.'
+        ))
@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 18:49
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_review_comment_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(django.db.models.functions.comparison.Collate('slug', 'NOCASE'), name='category_slug_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(django.db.models.functions.comparison.Collate('slug', 'NOCASE'), name='genre_slug_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(django.db.models.functions.comparison.Collate('name', 'NOCASE'), name='title_name_nocase_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+from reviews.search import get_create_sql, get_drop_sql, get_populate_sql
+
+
+def create_search_index(apps, schema_editor):
+    """Таблица FTS5 и триггеры создаются только на SQLite с FTS5,
+    в остальных случаях поиск использует индекс в памяти."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            for statement in get_create_sql():
+                cursor.execute(statement)
+        except OperationalError:
+            for statement in get_drop_sql():
+                cursor.execute(statement)
+            return
+        for statement in get_populate_sql():
+            cursor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in get_drop_sql():
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_filter_nocase_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 3.2 on 2026-10-18 19:04
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Collate
+
+
+def fill_histograms(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    Title.objects.update(**{
+        f'score_{score}_count': Coalesce(Subquery(
+            reviews.filter(score=score).annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField(),
+        ), 0)
+        for score in range(11)
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_search_index'),
+    ]
+
+    # Django 3.2 на SQLite пересоздаёт таблицу при добавлении полей и не
+    # умеет переносить индексы по выражениям, поэтому индекс снимается
+    # на время изменения таблицы.
+    operations = [
+        migrations.RemoveIndex(
+            model_name='title',
+            name='title_name_nocase_idx',
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_0_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 0'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_10_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 10'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_1_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 1'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_2_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 2'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_3_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 3'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_4_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 4'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_5_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 5'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_6_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 6'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_7_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 7'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_8_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 8'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_9_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Количество оценок 9'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(
+                Collate('name', 'NOCASE'), name='title_name_nocase_idx'
+            ),
+        ),
+        migrations.RunPython(fill_histograms, migrations.RunPython.noop),
+    ]
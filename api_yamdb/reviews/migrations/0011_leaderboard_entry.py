@@ -0,0 +1,67 @@
+# Generated by Django 3.2 on 2026-10-18 19:07
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+import django.db.models.deletion
+
+from reviews.leaderboards import get_compact_sql
+from reviews.models import MAX_SCORE, MIN_SCORE
+
+
+def fill_leaderboards(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    totals = Title.objects.using(schema_editor.connection.alias).aggregate(
+        score_sum=Sum('rating_sum'), count=Sum('rating_count')
+    )
+    mean = (
+        totals['score_sum'] / totals['count'] if totals['count']
+        else (MIN_SCORE + MAX_SCORE) / 2
+    )
+    with schema_editor.connection.cursor() as cursor:
+        for statement, params in get_compact_sql(
+            settings.LEADERBOARD['PRIOR_WEIGHT'], mean
+        ):
+            cursor.execute(statement, params)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_score_histogram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'Все произведения'), ('category', 'Категория'), ('genre', 'Жанр')], max_length=8, verbose_name='Область рейтинга')),
+                ('scope_id', models.IntegerField(default=0, verbose_name='Категория или жанр')),
+                ('title_category_id', models.IntegerField(null=True, verbose_name='Категория произведения')),
+                ('year', models.SmallIntegerField(verbose_name='Год выпуска')),
+                ('rating_sum', models.IntegerField(default=0, verbose_name='Сумма оценок')),
+                ('rating_count', models.IntegerField(default=0, verbose_name='Количество оценок')),
+                ('rating', models.FloatField(null=True, verbose_name='Рейтинг')),
+                ('bayesian_rating', models.FloatField(null=True, verbose_name='Байесовский рейтинг')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['scope', 'scope_id', '-rating', 'title'], name='leaderboard_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['scope', 'scope_id', '-bayesian_rating', 'title'], name='leaderboard_bayesian_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('scope', 'scope_id', 'title'), name='one leaderboard entry per title and scope'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
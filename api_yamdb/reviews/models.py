@@ -1,9 +1,15 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Collate
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
 
 from .validators import validate_year, validate_username
 
+MIN_SCORE = 0
+MAX_SCORE = 10
+SCORE_RANGE = range(MIN_SCORE, MAX_SCORE + 1)
+
 
 class User(AbstractUser):
     USER = 'user'
@@ -78,6 +84,12 @@ class Genre(models.Model):
     class Meta:
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
+        indexes = [
+            models.Index(
+                Collate('slug', 'NOCASE'),
+                name='genre_slug_nocase_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.name} {self.slug}'
@@ -96,6 +108,12 @@ class Category(models.Model):
     class Meta:
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
+        indexes = [
+            models.Index(
+                Collate('slug', 'NOCASE'),
+                name='category_slug_nocase_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.name} {self.slug}'
@@ -128,14 +146,108 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория',
     )
+    rating_sum = models.IntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.IntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False,
+    )
+    # Гистограмма оценок: по счётчику на каждое значение оценки. Поля
+    # обновляются вместе с суммой и количеством оценок.
+    score_0_count = models.IntegerField(
+        'Количество оценок 0', default=0, editable=False
+    )
+    score_1_count = models.IntegerField(
+        'Количество оценок 1', default=0, editable=False
+    )
+    score_2_count = models.IntegerField(
+        'Количество оценок 2', default=0, editable=False
+    )
+    score_3_count = models.IntegerField(
+        'Количество оценок 3', default=0, editable=False
+    )
+    score_4_count = models.IntegerField(
+        'Количество оценок 4', default=0, editable=False
+    )
+    score_5_count = models.IntegerField(
+        'Количество оценок 5', default=0, editable=False
+    )
+    score_6_count = models.IntegerField(
+        'Количество оценок 6', default=0, editable=False
+    )
+    score_7_count = models.IntegerField(
+        'Количество оценок 7', default=0, editable=False
+    )
+    score_8_count = models.IntegerField(
+        'Количество оценок 8', default=0, editable=False
+    )
+    score_9_count = models.IntegerField(
+        'Количество оценок 9', default=0, editable=False
+    )
+    score_10_count = models.IntegerField(
+        'Количество оценок 10', default=0, editable=False
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                Collate('name', 'NOCASE'),
+                name='title_name_nocase_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Счётчики оценок меняются только атомарными обновлениями при
+        записи отзывов. Обычное сохранение существующего произведения
+        (PATCH, админка) их не перезаписывает: иначе отзыв, добавленный
+        между загрузкой и сохранением, потерялся бы. Отложенные поля
+        (`.only()`, `.defer()`) не загружаются и не записываются."""
+        if (
+            not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @property
+    def score_histogram(self):
+        return [
+            getattr(self, score_field_name(score)) for score in SCORE_RANGE
+        ]
+
+
+def score_field_name(score):
+    return f'score_{score}_count'
+
+
+# Поля произведения, которые ведут сигналы отзывов.
+COUNTER_FIELDS = frozenset((
+    'rating_sum', 'rating_count',
+    *(score_field_name(score) for score in SCORE_RANGE),
+))
+
 
 class Review(models.Model):
     author = models.ForeignKey(
@@ -151,7 +263,9 @@ class Review(models.Model):
     )
     score = models.IntegerField(
         default=5,
-        validators=[MinValueValidator(0), MaxValueValidator(10)])
+        validators=[
+            MinValueValidator(MIN_SCORE), MaxValueValidator(MAX_SCORE)
+        ])
     text = models.TextField()
 
     class Meta:
@@ -164,9 +278,28 @@ class Review(models.Model):
                 name='Anti-abuse constraint: one review for one title'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
-        return self.name
+        return self.text
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения обновляется в post_save,
+        # поэтому запись отзыва и рейтинга выполняются в одной транзакции.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
 
 class Comment(models.Model):
@@ -187,6 +320,111 @@ class Comment(models.Model):
         ordering = ('-pub_date', )
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class LeaderboardEntry(models.Model):
+    """Строка материализованного рейтинга произведений: общего,
+    по категории или по жанру. Содержит копию статистики оценок
+    произведения, чтобы первые N мест читались по индексу."""
+
+    ALL = 'all'
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    SCOPES = [
+        (ALL, 'Все произведения'),
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+    ]
+    scope = models.CharField(
+        'Область рейтинга',
+        max_length=8,
+        choices=SCOPES,
+    )
+    scope_id = models.IntegerField(
+        'Категория или жанр',
+        default=0,
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='Произведение',
+    )
+    title_category_id = models.IntegerField(
+        'Категория произведения',
+        null=True,
+    )
+    year = models.SmallIntegerField('Год выпуска')
+    rating_sum = models.IntegerField('Сумма оценок', default=0)
+    rating_count = models.IntegerField('Количество оценок', default=0)
+    rating = models.FloatField('Рейтинг', null=True)
+    bayesian_rating = models.FloatField('Байесовский рейтинг', null=True)
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинги произведений'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'scope_id', 'title'],
+                name='one leaderboard entry per title and scope'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['scope', 'scope_id', '-rating', 'title'],
+                name='leaderboard_rating_idx',
+            ),
+            models.Index(
+                fields=['scope', 'scope_id', '-bayesian_rating', 'title'],
+                name='leaderboard_bayesian_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.scope} {self.scope_id}: {self.title_id}'
+
+
+class OutboundEmail(models.Model):
+    """Письмо в очереди на отправку (см. api/mail.py)."""
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    to = models.CharField('Получатель', max_length=254)
+    created = models.DateTimeField('Поставлено в очередь', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+    )
+    attempts = models.PositiveSmallIntegerField('Неудачные попытки', default=0)
+    claim = models.CharField(
+        'Метка обработчика',
+        max_length=32,
+        blank=True,
+    )
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                name='outbound_email_due_idx',
+                condition=models.Q(sent_at__isnull=True),
+            ),
+            models.Index(fields=['claim'], name='outbound_email_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
@@ -0,0 +1,133 @@
+import math
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .leaderboards import apply_score_delta, apply_score_deltas, delta_case
+from .models import SCORE_RANGE, Review, Title, score_field_name
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Произведений в одном UPDATE пакетного учёта отзывов: ограничивает
+# число параметров запроса.
+DELTA_BATCH_SIZE = 500
+
+
+def apply_score_changes(title_id, added=(), removed=()):
+    """Атомарно учитывает добавленные и удалённые оценки в сумме,
+    количестве и гистограмме оценок произведения одним UPDATE,
+    не читая его строку."""
+    added, removed = list(added), list(removed)
+    fields = {
+        'rating_sum': F('rating_sum') + sum(added) - sum(removed),
+        'rating_count': F('rating_count') + len(added) - len(removed),
+    }
+    changes = Counter(added)
+    changes.subtract(removed)
+    for score, delta in changes.items():
+        if delta:
+            name = score_field_name(score)
+            fields[name] = F(name) + delta
+    Title.objects.filter(pk=title_id).update(**fields)
+    apply_score_delta(
+        title_id, sum(added) - sum(removed), len(added) - len(removed)
+    )
+
+
+def _count_subquery(reviews, aggregate):
+    return Coalesce(
+        Subquery(
+            reviews.annotate(total=aggregate).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def recompute_ratings(titles=None):
+    """Пересчитывает рейтинг и гистограмму оценок по отзывам одним
+    UPDATE-запросом. Возвращает количество обновлённых произведений."""
+    if titles is None:
+        titles = Title.objects.all()
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return titles.update(
+        rating_sum=_count_subquery(reviews, Sum('score')),
+        rating_count=_count_subquery(reviews, Count('pk')),
+        **{
+            score_field_name(score): _count_subquery(
+                reviews.filter(score=score), Count('pk')
+            )
+            for score in SCORE_RANGE
+        },
+    )
+
+
+def apply_created_reviews(reviews):
+    """Учитывает в рейтингах отзывы, созданные через `bulk_create`:
+    в этом случае сигналы post_save не отправляются. Произведения
+    обновляются пачками, по UPDATE на пачку."""
+    histograms = defaultdict(Counter)
+    for review in reviews:
+        histograms[review.title_id][review.score] += 1
+    items = list(histograms.items())
+    for start in range(0, len(items), DELTA_BATCH_SIZE):
+        _apply_histograms(dict(items[start:start + DELTA_BATCH_SIZE]))
+
+
+def _apply_histograms(histograms):
+    """Добавляет гистограммы новых оценок к пачке произведений одним
+    UPDATE и одним UPDATE строк рейтингов."""
+    score_deltas = {
+        title_id: sum(score * amount for score, amount in counts.items())
+        for title_id, counts in histograms.items()
+    }
+    count_deltas = {
+        title_id: sum(counts.values())
+        for title_id, counts in histograms.items()
+    }
+    fields = {
+        'rating_sum': F('rating_sum') + delta_case(score_deltas),
+        'rating_count': F('rating_count') + delta_case(count_deltas),
+    }
+    for score in sorted(set().union(*histograms.values())):
+        name = score_field_name(score)
+        fields[name] = F(name) + delta_case({
+            title_id: counts[score]
+            for title_id, counts in histograms.items()
+        })
+    Title.objects.filter(pk__in=histograms).update(**fields)
+    apply_score_deltas(score_deltas, count_deltas)
+
+
+def score_stats(histogram):
+    """Статистика оценок по гистограмме: количество, среднее, медиана
+    и процентили. Время не зависит от числа отзывов — только от числа
+    возможных оценок."""
+    count = sum(histogram)
+    stats = {
+        'count': count,
+        'mean': None,
+        'median': None,
+        'percentiles': {f'p{percent}': None for percent in PERCENTILES},
+        'histogram': dict(zip(map(str, SCORE_RANGE), histogram)),
+    }
+    if not count:
+        return stats
+    stats['mean'] = sum(
+        score * amount for score, amount in zip(SCORE_RANGE, histogram)
+    ) / count
+    for percent in PERCENTILES:
+        # Метод ближайшего ранга: наименьшая оценка, до которой
+        # включительно набирается не менее percent% отзывов.
+        rank = max(math.ceil(percent * count / 100), 1)
+        cumulative = 0
+        for score, amount in zip(SCORE_RANGE, histogram):
+            cumulative += amount
+            if cumulative >= rank:
+                stats['percentiles'][f'p{percent}'] = score
+                break
+    stats['median'] = stats['percentiles']['p50']
+    return stats
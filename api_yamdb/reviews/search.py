@@ -0,0 +1,294 @@
+"""Полнотекстовый поиск по произведениям, отзывам и комментариям.
+
+На SQLite используется таблица FTS5 `search_index`, которую синхронизируют
+триггеры (см. миграцию 0009), поэтому индекс остаётся актуальным и при
+`bulk_create`, `update()` и каскадном удалении. На других СУБД или без FTS5
+используется инвертированный индекс в памяти процесса: он строится при
+первом поиске и обновляется сигналами моделей.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.db import connections
+
+TITLE = 1
+REVIEW = 2
+COMMENT = 3
+KINDS = {TITLE: 'title', REVIEW: 'review', COMMENT: 'comment'}
+KIND_CODES = {name: code for code, name in KINDS.items()}
+
+TABLE = 'search_index'
+
+# rowid документа = id объекта * 4 + код типа, поэтому удаление и замена
+# документа — это поиск по rowid, а не просмотр всего индекса.
+TITLE_SELECT = (
+    "SELECT {p}id * 4 + 1, {p}id, NULL, "
+    "{p}name || ' ' || coalesce({p}description, '')"
+)
+REVIEW_SELECT = 'SELECT {p}id * 4 + 2, {p}title_id, NULL, {p}text'
+COMMENT_SELECT = (
+    'SELECT {p}id * 4 + 3, '
+    '(SELECT title_id FROM reviews_review WHERE id = {p}review_id), '
+    '{p}review_id, {p}text'
+)
+SOURCES = (
+    ('reviews_title', TITLE, TITLE_SELECT, 'name, description'),
+    ('reviews_review', REVIEW, REVIEW_SELECT, 'text'),
+    ('reviews_comment', COMMENT, COMMENT_SELECT, 'text'),
+)
+INSERT = f'INSERT INTO {TABLE}(rowid, title_id, review_id, body) '
+
+
+def get_trigger_sql():
+    """SQL триггеров синхронизации. SQLite удаляет триггеры вместе
+    с таблицей, поэтому они пересоздаются после каждой миграции
+    (см. `ensure_triggers`)."""
+    statements = []
+    for table, kind, select, columns in SOURCES:
+        insert = INSERT + select.format(p='new.') + ';'
+        delete = f'DELETE FROM {TABLE} WHERE rowid = old.id * 4 + {kind};'
+        statements += [
+            f'CREATE TRIGGER IF NOT EXISTS {table}_search_ai '
+            f'AFTER INSERT ON {table} BEGIN {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {table}_search_au '
+            f'AFTER UPDATE OF {columns} ON {table} '
+            f'BEGIN {delete} {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {table}_search_ad '
+            f'AFTER DELETE ON {table} BEGIN {delete} END',
+        ]
+    return statements
+
+
+def get_create_sql():
+    """SQL создания таблицы FTS5 и триггеров синхронизации."""
+    return [
+        f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+        "title_id UNINDEXED, review_id UNINDEXED, body, "
+        "tokenize='unicode61')"
+    ] + get_trigger_sql()
+
+
+def get_drop_sql():
+    statements = [
+        f'DROP TRIGGER IF EXISTS {table}_search_{suffix}'
+        for table, _, _, _ in SOURCES for suffix in ('ai', 'au', 'ad')
+    ]
+    return statements + [f'DROP TABLE IF EXISTS {TABLE}']
+
+
+def get_populate_sql():
+    """SQL полного перестроения индекса по текущим данным."""
+    return [f'DELETE FROM {TABLE}'] + [
+        f'{INSERT}{select.format(p=table + ".")} FROM {table}'
+        for table, _, select, _ in SOURCES
+    ]
+
+
+def tokenize(text):
+    return re.findall(r'\w+', text.lower())
+
+
+class FTSResults:
+    """Ленивый результат поиска FTS5 для пагинатора Django: количество
+    и срезы вычисляются отдельными запросами."""
+
+    def __init__(self, using, tokens, kind=None):
+        self.using = using
+        self.match = ' '.join(f'"{token}"' for token in tokens)
+        self.where = f'{TABLE} MATCH %s'
+        self.params = [self.match]
+        if kind is not None:
+            self.where += ' AND (rowid & 3) = %s'
+            self.params.append(kind)
+
+    def count(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {TABLE} WHERE {self.where}',
+                self.params,
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, title_id, review_id, rank FROM {TABLE} '
+                f'WHERE {self.where} ORDER BY rank LIMIT %s OFFSET %s',
+                self.params + [index.stop - start, start],
+            )
+            return [
+                make_result(rowid, title_id, review_id, -rank)
+                for rowid, title_id, review_id, rank in cursor.fetchall()
+            ]
+
+
+def make_result(rowid, title_id, review_id, score):
+    return {
+        'type': KINDS[rowid & 3],
+        'id': rowid >> 2,
+        'title_id': title_id,
+        'review_id': review_id,
+        'score': round(score, 4),
+    }
+
+
+class MemorySearchIndex:
+    """Инвертированный индекс в памяти с ранжированием BM25."""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.is_built = False
+        self.postings = defaultdict(dict)
+        self.documents = {}
+
+    def build(self):
+        from .models import Comment, Review, Title
+
+        with self._lock:
+            self.postings.clear()
+            self.documents.clear()
+            for pk, name, description in Title.objects.values_list(
+                'pk', 'name', 'description'
+            ).iterator():
+                self._add(pk * 4 + TITLE, pk, None,
+                          f'{name} {description or ""}')
+            for pk, title_id, text in Review.objects.values_list(
+                'pk', 'title_id', 'text'
+            ).iterator():
+                self._add(pk * 4 + REVIEW, title_id, None, text)
+            for pk, title_id, review_id, text in Comment.objects.values_list(
+                'pk', 'review__title_id', 'review_id', 'text'
+            ).iterator():
+                self._add(pk * 4 + COMMENT, title_id, review_id, text)
+            self.is_built = True
+
+    def invalidate(self):
+        with self._lock:
+            self.is_built = False
+            self.postings.clear()
+            self.documents.clear()
+
+    def _add(self, rowid, title_id, review_id, text):
+        self._remove(rowid)
+        counts = Counter(tokenize(text))
+        for token, frequency in counts.items():
+            self.postings[token][rowid] = frequency
+        self.documents[rowid] = (
+            title_id, review_id, sum(counts.values()), tuple(counts)
+        )
+
+    def _remove(self, rowid):
+        document = self.documents.pop(rowid, None)
+        if document is None:
+            return
+        for token in document[3]:
+            self.postings[token].pop(rowid, None)
+            if not self.postings[token]:
+                del self.postings[token]
+
+    def update(self, kind, pk, title_id, review_id, text):
+        with self._lock:
+            if self.is_built:
+                self._add(pk * 4 + kind, title_id, review_id, text)
+
+    def remove(self, kind, pk):
+        with self._lock:
+            if self.is_built:
+                self._remove(pk * 4 + kind)
+
+    def search(self, tokens, kind=None):
+        with self._lock:
+            if not self.is_built:
+                self.build()
+            postings = [self.postings.get(token, {}) for token in tokens]
+            if not postings or not all(postings):
+                return []
+            total = len(self.documents)
+            average = sum(
+                document[2] for document in self.documents.values()
+            ) / total
+            scores = {}
+            for rowid in set.intersection(*map(set, postings)):
+                if kind is not None and rowid & 3 != kind:
+                    continue
+                length = self.documents[rowid][2]
+                score = 0.0
+                for posting in postings:
+                    frequency = posting[rowid]
+                    idf = math.log(
+                        1 + (total - len(posting) + 0.5)
+                        / (len(posting) + 0.5)
+                    )
+                    score += idf * frequency * (self.K1 + 1) / (
+                        frequency + self.K1 * (
+                            1 - self.B + self.B * length / average
+                        )
+                    )
+                scores[rowid] = score
+            ranked = sorted(scores.items(), key=lambda item: (-item[1],
+                                                              item[0]))
+            return [
+                make_result(rowid, *self.documents[rowid][:2], score)
+                for rowid, score in ranked
+            ]
+
+
+memory_index = MemorySearchIndex()
+_fts_tables = {}
+
+
+def has_fts_index(using='default'):
+    if using not in _fts_tables:
+        connection = connections[using]
+        _fts_tables[using] = (
+            connection.vendor == 'sqlite'
+            and TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[using]
+
+
+def ensure_triggers(using='default'):
+    _fts_tables.pop(using, None)
+    if has_fts_index(using):
+        with connections[using].cursor() as cursor:
+            for statement in get_trigger_sql():
+                cursor.execute(statement)
+
+
+def search(query, kind=None, using='default'):
+    """Ищет документы, содержащие все слова запроса. Возвращает
+    последовательность результатов, отсортированных по релевантности."""
+    tokens = tokenize(query)
+    code = KIND_CODES.get(kind)
+    if not tokens:
+        return []
+    if has_fts_index(using):
+        return FTSResults(using, tokens, code)
+    return memory_index.search(tokens, code)
+
+
+def rebuild(using='default'):
+    if has_fts_index(using):
+        with connections[using].cursor() as cursor:
+            for statement in get_populate_sql():
+                cursor.execute(statement)
+    else:
+        memory_index.invalidate()
+
+
+def mark_stale(using='default'):
+    """Сообщает индексу, что данные изменены в обход сигналов
+    (например, `bulk_create`). Таблицу FTS5 обновляют триггеры."""
+    if not has_fts_index(using):
+        memory_index.invalidate()
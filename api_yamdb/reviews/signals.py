@@ -0,0 +1,127 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import Signal, receiver
+
+from . import search
+from .leaderboards import sync_title
+from .models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                     Title)
+from .ratings import apply_score_changes, recompute_ratings
+from .search import ensure_triggers, has_fts_index, memory_index
+
+# Данные изменены в обход сигналов моделей: импортом, пересчётом или
+# перестройкой рейтингов.
+bulk_data_changed = Signal()
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, **kwargs):
+    """Учитывает новый или изменённый отзыв в рейтинге произведения."""
+    old_score = getattr(instance, '_loaded_score', None)
+    old_title_id = getattr(instance, '_loaded_title_id', None)
+    if created:
+        apply_score_changes(instance.title_id, added=[instance.score])
+    elif old_score is None or old_title_id is None:
+        recompute_ratings(Title.objects.filter(pk=instance.title_id))
+        sync_title(instance.title_id)
+    elif old_title_id != instance.title_id:
+        apply_score_changes(old_title_id, removed=[old_score])
+        apply_score_changes(instance.title_id, added=[instance.score])
+    elif old_score != instance.score:
+        apply_score_changes(
+            instance.title_id, added=[instance.score], removed=[old_score]
+        )
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    """Исключает удалённый отзыв из рейтинга, в том числе при каскадном
+    удалении автора или произведения."""
+    apply_score_changes(instance.title_id, removed=[instance.score])
+
+
+@receiver(post_save, sender=Title)
+def sync_leaderboards_on_title_save(sender, instance, **kwargs):
+    """Переносит произведение в рейтинги его новой категории."""
+    sync_title(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def sync_leaderboards_on_genre_change(sender, instance, action, reverse,
+                                      pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        sync_title(instance.pk)
+        return
+    if pk_set is None:
+        # Жанр очищен целиком: список произведений уже недоступен.
+        LeaderboardEntry.objects.filter(
+            scope=LeaderboardEntry.GENRE, scope_id=instance.pk
+        ).delete()
+        return
+    for title_id in pk_set:
+        sync_title(title_id)
+
+
+@receiver(post_delete, sender=Genre)
+def delete_genre_leaderboard(sender, instance, **kwargs):
+    LeaderboardEntry.objects.filter(
+        scope=LeaderboardEntry.GENRE, scope_id=instance.pk
+    ).delete()
+
+
+@receiver(post_delete, sender=Category)
+def delete_category_leaderboard(sender, instance, **kwargs):
+    LeaderboardEntry.objects.filter(
+        scope=LeaderboardEntry.CATEGORY, scope_id=instance.pk
+    ).delete()
+    LeaderboardEntry.objects.filter(
+        title_category_id=instance.pk
+    ).update(title_category_id=None)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def update_memory_search_index(sender, instance, using, **kwargs):
+    """Поддерживает индекс поиска в памяти, если в БД нет FTS5:
+    таблицу FTS5 синхронизируют триггеры."""
+    if has_fts_index(using) or not memory_index.is_built:
+        return
+    if sender is Title:
+        memory_index.update(
+            search.TITLE, instance.pk, instance.pk, None,
+            f'{instance.name} {instance.description or ""}'
+        )
+    elif sender is Review:
+        memory_index.update(
+            search.REVIEW, instance.pk, instance.title_id, None, instance.text
+        )
+    else:
+        memory_index.update(
+            search.COMMENT, instance.pk, instance.review.title_id,
+            instance.review_id, instance.text
+        )
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def remove_from_memory_search_index(sender, instance, using, **kwargs):
+    if has_fts_index(using):
+        return
+    kind = {Title: search.TITLE, Review: search.REVIEW}.get(
+        sender, search.COMMENT
+    )
+    memory_index.remove(kind, instance.pk)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    """Восстанавливает триггеры индекса поиска, если миграция
+    пересоздала таблицу модели."""
+    if sender.name == 'reviews':
+        ensure_triggers(using)
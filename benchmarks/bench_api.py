@@ -0,0 +1,71 @@
+"""Бенчмарк эндпоинтов API на синтетических данных.
+
+Пример запуска из корня репозитория:
+    python -m benchmarks.bench_api --reviews 100000 --json api.json
+"""
+import argparse
+import json
+import os
+import platform
+import tempfile
+import warnings
+
+from benchmarks.common import measure, seed, setup_django
+from benchmarks.endpoints import (BENCH_SETTINGS, NO_CACHE, get_clients,
+                                  get_endpoints, make_request)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--genres', type=int, default=20)
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--reviews', type=int, default=50000)
+    parser.add_argument('--comments', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument(
+        '--cache', action='store_true',
+        help='Не отключать кэш каталога и пользователей.',
+    )
+    parser.add_argument('--only', help='Подстрока в имени эндпоинта.')
+    parser.add_argument('--json', help='Файл для результатов в JSON.')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    overrides = dict(BENCH_SETTINGS)
+    if not args.cache:
+        overrides['CACHES'] = NO_CACHE
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(os.path.join(tmp_dir, 'bench.sqlite3'), **overrides)
+        from django.db import connection
+
+        seed(users=args.users, titles=args.titles, genres=args.genres,
+             categories=args.categories, reviews=args.reviews,
+             comments=args.comments)
+        endpoints, user = get_endpoints()
+        anonymous, authenticated = get_clients(user)
+        results = {}
+        for endpoint in endpoints:
+            if args.only and args.only not in endpoint.name:
+                continue
+            request = make_request(endpoint, anonymous, authenticated)
+            size = len(request().content)
+            stats = results[endpoint.name] = measure(request, args.repeat)
+            stats['bytes'] = size
+            print(f'{endpoint.name:40} {stats["median_ms"]:>9} ms  '
+                  f'p95 {stats["p95_ms"]:>9} ms  {stats["rps"]:>8} rps  '
+                  f'{size:>8} B')
+        connection.close()
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump({
+                'python': platform.python_version(),
+                'parameters': vars(args),
+                'results': results,
+            }, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Сравнение пропускной способности чтения под WSGI (пул потоков),
+ASGI с синхронными вьюсетами и ASGI с асинхронными обработчиками чтения.
+
+Пример запуска из корня репозитория:
+    python -m benchmarks.bench_asgi --concurrency 32 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import seed, setup_django
+from benchmarks.endpoints import BENCH_SETTINGS, NO_CACHE
+
+MODES = ('wsgi', 'asgi-sync', 'asgi-async')
+
+
+def get_urls():
+    from reviews.models import Title
+
+    title = Title.objects.order_by('-rating_count').first()
+    return [
+        '/api/v1/titles/',
+        '/api/v1/genres/',
+        f'/api/v1/titles/{title.pk}/reviews/',
+    ]
+
+
+def run_wsgi(urls, total, concurrency):
+    from django.test import Client
+
+    def request(index):
+        response = Client().get(urls[index % len(urls)])
+        assert response.status_code == 200
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(request, range(total)))
+
+
+def run_asgi(urls, total, concurrency):
+    from django.test import AsyncClient
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        client = AsyncClient()
+
+        async def request(index):
+            async with semaphore:
+                response = await client.get(urls[index % len(urls)])
+            assert response.status_code == 200
+
+        await asyncio.gather(*(request(index) for index in range(total)))
+
+    asyncio.run(main())
+
+
+def run_mode(args):
+    overrides = dict(BENCH_SETTINGS, CACHES=NO_CACHE,
+                     ASYNC_READ_VIEWS=args.mode == 'asgi-async')
+    setup_django(args.db, **overrides)
+    urls = get_urls()
+    runner = run_wsgi if args.mode == 'wsgi' else run_asgi
+    runner(urls, len(urls) * 5, args.concurrency)
+    started = time.perf_counter()
+    runner(urls, args.requests, args.concurrency)
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'mode': args.mode,
+        'concurrency': args.concurrency,
+        'requests': args.requests,
+        'seconds': round(elapsed, 3),
+        'rps': round(args.requests / elapsed, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--mode', choices=MODES)
+    parser.add_argument('--db', help='Готовая БД (для запуска одного режима).')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=50000)
+    parser.add_argument('--json', help='Файл для результатов в JSON.')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    if args.mode:
+        return run_mode(args)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.sqlite3')
+        setup_django(db_path, **BENCH_SETTINGS)
+        seed(users=1000, titles=200, reviews=args.reviews)
+        # Каждый режим запускается в отдельном процессе: набор URL
+        # с асинхронными обработчиками определяется при импорте urls.py.
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_asgi',
+                 '--mode', mode, '--db', db_path,
+                 '--concurrency', str(args.concurrency),
+                 '--requests', str(args.requests)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+            print(f'{mode:12} {results[-1]["rps"]:>9} rps  '
+                  f'({results[-1]["seconds"]} с)')
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Сравнение планов и времени запросов вложенных ресурсов и фильтров
+произведений без индексов и с индексами из моделей `reviews`.
+
+Пример запуска из корня репозитория:
+    python -m benchmarks.bench_indexes --reviews 1000000 --json out.json
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.common import measure, seed, setup_django
+
+INDEXED_MODELS = ('Review', 'Comment', 'Title', 'Genre', 'Category')
+
+
+def get_queries():
+    from reviews.models import Comment, Review, Title
+
+    title_id = 1
+    review = Review.objects.filter(title_id=title_id).first()
+    return {
+        'reviews_of_title': Review.objects.filter(
+            title_id=title_id
+        ).order_by('-pub_date', 'id')[:10],
+        'review_by_pk_and_title': Review.objects.filter(
+            pk=review.pk, title_id=title_id
+        ),
+        'comments_of_review': Comment.objects.filter(
+            review_id=review.pk
+        ).order_by('-pub_date', 'id')[:10],
+        'titles_by_name': Title.objects.filter(name__iexact='произведение 7'),
+        'titles_by_category': Title.objects.filter(
+            category__slug__iexact='CATEGORY-1'
+        )[:10],
+        'titles_by_genre': Title.objects.filter(
+            genre__slug__iexact='GENRE-1'
+        )[:10],
+    }
+
+
+def run_queries(repeat):
+    from django.db import connection
+
+    result = {}
+    with connection.cursor() as cursor:
+        for name, queryset in get_queries().items():
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+
+            def execute():
+                cursor.execute(sql, params)
+                cursor.fetchall()
+
+            result[name] = {'plan': plan, **measure(execute, repeat)}
+    return result
+
+
+def get_indexes():
+    from django.apps import apps
+
+    return [
+        (model, index)
+        for model in map(apps.get_app_config('reviews').get_model,
+                         INDEXED_MODELS)
+        for index in model._meta.indexes
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--titles', type=int, default=200)
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--comments', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help='Файл для результатов в JSON.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        setup_django(os.path.join(tmp_dir, 'bench.sqlite3'))
+        from django.db import connection
+
+        seed(users=args.users, titles=args.titles, reviews=args.reviews,
+             comments=args.comments)
+        indexes = get_indexes()
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        before = run_queries(args.repeat)
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        after = run_queries(args.repeat)
+        connection.close()
+
+    report = {
+        name: {'before': before[name], 'after': after[name]}
+        for name in before
+    }
+    for name, data in report.items():
+        print(name)
+        for stage, stats in data.items():
+            print(f'  {stage:6} {stats["median_ms"]:>9} ms  '
+                  f'p95 {stats["p95_ms"]:>9} ms')
+            for line in stats['plan']:
+                print(f'         {line}')
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Микробенчмарк JSON-рендереров и парсеров на страницах произведений
+и отзывов того же вида, что отдаёт API.
+
+Пример запуска из корня репозитория:
+    python -m benchmarks.bench_json --page-size 100
+"""
+import argparse
+import io
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import PROJECT_DIR, measure
+
+
+def title_page(size):
+    return {
+        'count': size * 10,
+        'next': 'http://testserver/api/v1/titles/?page=2',
+        'previous': None,
+        'results': [
+            {
+                'id': i,
+                'name': f'Произведение {i}',
+                'year': 1950 + i % 70,
+                'description': 'Описание произведения ' * 5,
+                'genre': [
+                    {'name': f'Жанр {i % 20}', 'slug': f'genre-{i % 20}'},
+                    {'name': f'Жанр {i % 7}', 'slug': f'genre-{i % 7}'},
+                ],
+                'category': {
+                    'name': f'Категория {i % 5}', 'slug': f'category-{i % 5}'
+                },
+                'rating': i % 11,
+            }
+            for i in range(size)
+        ],
+    }
+
+
+def review_page(size, native_dates):
+    started = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    results = []
+    for i in range(size):
+        pub_date = started + timedelta(seconds=i * 37, microseconds=i)
+        results.append({
+            'id': i,
+            'text': f'Отзыв номер {i}. ' * 10,
+            'author': f'user{i}',
+            'score': i % 11,
+            'pub_date': (
+                pub_date if native_dates
+                else pub_date.isoformat().replace('+00:00', 'Z')
+            ),
+        })
+    return {'next': None, 'previous': None, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from api import renderers
+    from api.renderers import FastJSONParser, FastJSONRenderer
+
+    if renderers.orjson is None:
+        print('orjson не установлен: FastJSONRenderer использует stdlib.')
+    pages = {
+        'titles': title_page(args.page_size),
+        'reviews': review_page(args.page_size, native_dates=False),
+        'reviews_native_dates': review_page(args.page_size, True),
+    }
+    for name, page in pages.items():
+        content = JSONRenderer().render(page)
+        cases = {
+            'render stdlib': lambda: JSONRenderer().render(page),
+            'render fast': lambda: FastJSONRenderer().render(page),
+            'parse stdlib': lambda: JSONParser().parse(io.BytesIO(content)),
+            'parse fast': lambda: FastJSONParser().parse(
+                io.BytesIO(content)
+            ),
+        }
+        for case, func in cases.items():
+            stats = measure(func, args.repeat)
+            print(f'{name:22} {case:14} {stats["median_ms"]:>9} ms  '
+                  f'{len(content):>8} B')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Конкурентные чтение и запись отзывов на профилях БД sqlite и
+sqlite-prod (WAL, busy_timeout, прагмы, постоянные соединения).
+
+Пример запуска из корня репозитория:
+    python -m benchmarks.bench_sqlite --readers 8 --writers 4 --seconds 10
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+from benchmarks.common import percentile, seed, setup_django
+from benchmarks.endpoints import BENCH_SETTINGS, NO_CACHE
+
+PROFILES = ('sqlite', 'sqlite-prod')
+
+
+def p95_ms(timings):
+    value = percentile(timings, 95)
+    return None if value is None else round(value * 1000, 3)
+
+
+def get_writers(count):
+    """Токены пользователей без отзывов: каждый пишет по одному отзыву."""
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from reviews.models import User
+
+    users = User.objects.filter(reviews__isnull=True).order_by('pk')
+    tokens = [str(AccessToken.for_user(user)) for user in users]
+    return [tokens[start::count] for start in range(count)]
+
+
+def run_threads(workers, seconds):
+    """Выполняет `workers` в отдельных потоках до истечения `seconds`.
+    Каждый обработчик принимает клиент и номер запроса и возвращает вид
+    операции: read или write."""
+    from django.db import connections
+    from django.test import Client
+
+    deadline = time.monotonic() + seconds
+    stats = {'read': [], 'write': [], 'errors': 0}
+    lock = threading.Lock()
+
+    def loop(request):
+        client = Client()
+        index = 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                kind = request(client, index)
+            except Exception:
+                kind = None
+            elapsed = time.perf_counter() - started
+            with lock:
+                if kind is None:
+                    stats['errors'] += 1
+                else:
+                    stats[kind].append(elapsed)
+            index += 1
+        connections.close_all()
+
+    threads = [threading.Thread(target=loop, args=(worker,))
+               for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
+
+
+def make_reader(title_ids):
+    def read(client, index):
+        title_id = title_ids[index % len(title_ids)]
+        url = (f'/api/v1/titles/{title_id}/reviews/' if index % 2
+               else '/api/v1/titles/')
+        assert client.get(url).status_code == 200
+        return 'read'
+    return read
+
+
+def make_writer(title_ids, tokens):
+    def write(client, index):
+        response = client.post(
+            f'/api/v1/titles/{title_ids[index % len(title_ids)]}/reviews/',
+            {'text': 'Отзыв из бенчмарка', 'score': index % 11},
+            HTTP_AUTHORIZATION=f'Bearer {tokens[index]}',
+        )
+        assert response.status_code == 201
+        return 'write'
+    return write
+
+
+def run_profile(args):
+    setup_django(args.db, **BENCH_SETTINGS, CACHES=NO_CACHE)
+    from django.db import connections
+
+    from reviews.models import Title
+
+    title_ids = list(Title.objects.values_list('pk', flat=True))
+    workers = [make_reader(title_ids)] * args.readers + [
+        make_writer(title_ids, tokens)
+        for tokens in get_writers(args.writers)
+    ]
+    connections.close_all()
+    stats = run_threads(workers, args.seconds)
+    print(json.dumps({
+        'profile': os.environ['API_DATABASE_PROFILE'],
+        'reads_per_s': round(len(stats['read']) / args.seconds, 1),
+        'writes_per_s': round(len(stats['write']) / args.seconds, 1),
+        'errors': stats['errors'],
+        'read_p95_ms': p95_ms(stats['read']),
+        'write_p95_ms': p95_ms(stats['write']),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profile', choices=PROFILES)
+    parser.add_argument('--db',
+                        help='Готовая БД (для запуска одного профиля).')
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--reviews', type=int, default=50000)
+    parser.add_argument('--json', help='Файл для результатов в JSON.')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    if args.profile:
+        return run_profile(args)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        seed_path = os.path.join(tmp_dir, 'seed.sqlite3')
+        setup_django(seed_path, **BENCH_SETTINGS)
+        seed(users=5000, titles=200, reviews=args.reviews)
+        # Профиль выбирается при импорте настроек, а режим WAL сохраняется
+        # в файле БД, поэтому каждый профиль работает в своём процессе
+        # на своей копии БД.
+        for profile in PROFILES:
+            db_path = os.path.join(tmp_dir, f'{profile}.sqlite3')
+            shutil.copy(seed_path, db_path)
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_sqlite',
+                 '--profile', profile, '--db', db_path,
+                 '--readers', str(args.readers),
+                 '--writers', str(args.writers),
+                 '--seconds', str(args.seconds)],
+                check=True, capture_output=True, text=True,
+                env={**os.environ, 'API_DATABASE_PROFILE': profile},
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+            result = results[-1]
+            print(f'{profile:12} чтение {result["reads_per_s"]:>8}/с  '
+                  f'запись {result["writes_per_s"]:>7}/с  '
+                  f'ошибок {result["errors"]:>5}  '
+                  f'p95 записи {result["write_p95_ms"]} мс')
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
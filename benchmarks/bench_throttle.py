@@ -0,0 +1,78 @@
+"""Накладные расходы проверки частоты запросов на один запрос: корзина
+токенов в памяти процесса против AnonRateThrottle DRF, который читает и
+пишет историю запросов в кэш.
+
+Пример запуска из корня репозитория:
+    python -m benchmarks.bench_throttle --calls 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmarks.common import PROJECT_DIR, measure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--clients', type=int, default=100)
+    args = parser.parse_args()
+
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    from django.conf import settings
+    django.setup()
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import caches
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.throttling import AnonRateThrottle
+
+    from api.throttling import AnonReadThrottle
+
+    settings.THROTTLE_RATES = {'anon-read': ('1000000/s', 1000000)}
+    factory = APIRequestFactory()
+    requests = []
+    for index in range(args.clients):
+        request = Request(factory.get(
+            '/api/v1/titles/', REMOTE_ADDR=f'10.0.{index // 256}.{index % 256}'
+        ))
+        request.user = AnonymousUser()
+        requests.append(request)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        settings.CACHES = {
+            **settings.CACHES,
+            'file': {
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': cache_dir,
+            },
+        }
+
+        def drf_throttle(alias):
+            return type('Throttle', (AnonRateThrottle,), {
+                'rate': '1000000/s', 'cache': caches[alias]
+            })
+
+        throttles = {
+            'in-process bucket': AnonReadThrottle,
+            'DRF + locmem cache': drf_throttle('default'),
+            'DRF + file cache': drf_throttle('file'),
+        }
+        for name, throttle_class in throttles.items():
+            def run():
+                for index in range(args.calls):
+                    assert throttle_class().allow_request(
+                        requests[index % len(requests)], None
+                    )
+            stats = measure(run, args.repeat)
+            per_call = stats['median_ms'] * 1000 / args.calls
+            print(f'{name:20} {per_call:>9.2f} мкс на запрос')
+
+
+if __name__ == '__main__':
+    main()
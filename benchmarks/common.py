@@ -0,0 +1,137 @@
+"""Общие утилиты бенчмарков: настройка Django на отдельной БД
+и быстрое заполнение таблиц сырыми INSERT-запросами."""
+import math
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+BASE_DATE = datetime(2020, 1, 1)
+
+
+def setup_django(db_path, **overrides):
+    """Настраивает Django на файл БД `db_path` и применяет миграции.
+    Именованные аргументы переопределяют одноимённые настройки."""
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+
+def _insert(cursor, model, fields, rows):
+    table = model._meta.db_table
+    columns = ', '.join(f'"{field}"' for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    cursor.executemany(
+        f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders})', rows
+    )
+
+
+def _pub_date(index):
+    return str(BASE_DATE + timedelta(seconds=index))
+
+
+def seed(users=1000, titles=200, genres=20, categories=5,
+         reviews=10000, comments=0, chunk_size=50000):
+    """Заполняет БД синтетическими данными. Пары (автор, произведение)
+    отзывов уникальны, поэтому `users * titles` должно быть не меньше
+    `reviews`."""
+    from django.db import connection, transaction
+
+    from reviews.leaderboards import compact
+    from reviews.models import (SCORE_RANGE, Category, Comment, Genre,
+                                Review, Title, User, score_field_name)
+    from reviews.ratings import recompute_ratings
+
+    if users * titles < reviews:
+        raise ValueError('users * titles должно быть не меньше reviews')
+    with transaction.atomic(), connection.cursor() as cursor:
+        _insert(cursor, User, (
+            'id', 'username', 'email', 'password', 'first_name',
+            'last_name', 'bio', 'role', 'is_superuser', 'is_staff',
+            'is_active', 'date_joined',
+        ), (
+            (i, f'user{i}', f'user{i}@yamdb.fake', '', '', '', '',
+             User.USER, False, False, True, _pub_date(0))
+            for i in range(1, users + 1)
+        ))
+        _insert(cursor, Category, ('id', 'name', 'slug'), (
+            (i, f'Категория {i}', f'category-{i}')
+            for i in range(1, categories + 1)
+        ))
+        _insert(cursor, Genre, ('id', 'name', 'slug'), (
+            (i, f'Жанр {i}', f'genre-{i}') for i in range(1, genres + 1)
+        ))
+        _insert(cursor, Title, (
+            'id', 'name', 'year', 'description', 'category_id',
+            'rating_sum', 'rating_count',
+            *(score_field_name(score) for score in SCORE_RANGE),
+        ), (
+            (i, f'Произведение {i}', 1950 + i % 70, f'Описание {i}',
+             i % categories + 1, 0, 0, *(0 for _ in SCORE_RANGE))
+            for i in range(1, titles + 1)
+        ))
+        _insert(cursor, Title.genre.through, ('title_id', 'genre_id'), (
+            (i, (i + offset) % genres + 1)
+            for i in range(1, titles + 1) for offset in range(2)
+        ))
+        for start in range(0, reviews, chunk_size):
+            stop = min(start + chunk_size, reviews)
+            _insert(cursor, Review, (
+                'id', 'author_id', 'title_id', 'score', 'text', 'pub_date',
+            ), (
+                (i + 1, i // titles + 1, i % titles + 1, i % 11,
+                 f'Отзыв {i}', _pub_date(i))
+                for i in range(start, stop)
+            ))
+        for start in range(0, comments, chunk_size):
+            stop = min(start + chunk_size, comments)
+            _insert(cursor, Comment, (
+                'id', 'author_id', 'review_id', 'text', 'pub_date',
+            ), (
+                (i + 1, i % users + 1, i % reviews + 1, f'Комментарий {i}',
+                 _pub_date(i))
+                for i in range(start, stop)
+            ))
+        recompute_ratings()
+        compact()
+        cursor.execute('ANALYZE')
+
+
+def percentile(timings, percent):
+    """Процентиль методом ближайшего ранга: наименьшее значение, до
+    которого включительно набирается не менее percent% замеров."""
+    if not timings:
+        return None
+    timings = sorted(timings)
+    rank = max(math.ceil(percent * len(timings) / 100), 1)
+    return timings[rank - 1]
+
+
+def measure(func, repeat=20):
+    """Возвращает медиану и p95 времени выполнения `func` в миллисекундах
+    и пропускную способность при последовательных вызовах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    mean = statistics.mean(timings)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'rps': round(1000 / mean, 1) if mean else None,
+    }
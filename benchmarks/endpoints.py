@@ -0,0 +1,122 @@
+"""Каталог эндпоинтов API для бенчмарков на заполненной БД."""
+from collections import namedtuple
+from itertools import combinations, count
+
+Endpoint = namedtuple('Endpoint', 'name method url data authenticated')
+
+NO_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+BENCH_SETTINGS = {
+    'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+    'THROTTLE_RATES': {},
+}
+
+# Поля для сравнения с полным ответом: `?fields=` без вложенных объектов.
+SLIM_TITLE_FIELDS = 'id,name,rating'
+SLIM_REVIEW_FIELDS = 'id,score,author'
+
+
+def title_filters(title):
+    """Все сочетания параметров TitleFilter для произведения `title`."""
+    params = {
+        'category': title.category.slug,
+        'genre': title.genre.first().slug,
+        'name': title.name,
+        'year': title.year,
+    }
+    for size in range(len(params) + 1):
+        for names in combinations(params, size):
+            yield names, '&'.join(f'{name}={params[name]}' for name in names)
+
+
+def signup_data(number):
+    return {
+        'username': f'bench{number}', 'email': f'bench{number}@yamdb.fake'
+    }
+
+
+def get_endpoints():
+    """Список эндпоинтов. Для POST-запросов `data` — функция, которая
+    возвращает тело очередного запроса."""
+    from django.contrib.auth.tokens import default_token_generator
+
+    from django.db.models import Count
+
+    from reviews.models import Review, Title, User
+
+    title = Title.objects.order_by('-rating_count').first()
+    review = Review.objects.filter(title=title).first()
+    # Список комментариев замеряется на самом обсуждаемом отзыве, а не
+    # на пустой странице.
+    commented = Review.objects.annotate(
+        comments_count=Count('comments')
+    ).order_by('-comments_count', 'pk').first()
+    user = User.objects.get(pk=review.author_id)
+    code = default_token_generator.make_token(user)
+    signups = count()
+
+    endpoints = [
+        Endpoint(
+            'titles_list' + ''.join(f'_{name}' for name in names),
+            'get', f'/api/v1/titles/?{query}', None, False
+        )
+        for names, query in title_filters(title)
+    ]
+    endpoints += [
+        Endpoint('titles_list_slim', 'get',
+                 f'/api/v1/titles/?fields={SLIM_TITLE_FIELDS}', None, False),
+        Endpoint('title_detail', 'get', f'/api/v1/titles/{title.pk}/',
+                 None, False),
+        Endpoint('genres_list', 'get', '/api/v1/genres/', None, False),
+        Endpoint('categories_list', 'get', '/api/v1/categories/', None,
+                 False),
+        Endpoint('reviews_list', 'get',
+                 f'/api/v1/titles/{title.pk}/reviews/', None, False),
+        Endpoint('reviews_list_cursor', 'get',
+                 f'/api/v1/titles/{title.pk}/reviews/?pagination=cursor',
+                 None, False),
+        Endpoint('reviews_list_slim', 'get',
+                 f'/api/v1/titles/{title.pk}/reviews/'
+                 f'?fields={SLIM_REVIEW_FIELDS}', None, False),
+        Endpoint('review_detail', 'get',
+                 f'/api/v1/titles/{title.pk}/reviews/{review.pk}/', None,
+                 False),
+        Endpoint('comments_list', 'get',
+                 f'/api/v1/titles/{commented.title_id}/reviews/'
+                 f'{commented.pk}/comments/', None, False),
+        Endpoint('signup', 'post', '/api/v1/auth/signup/',
+                 lambda: signup_data(next(signups)), False),
+        Endpoint('token', 'post', '/api/v1/auth/token/', lambda: {
+            'username': user.username, 'confirmation_code': code,
+        }, False),
+        Endpoint('users_me', 'get', '/api/v1/users/me/', None, True),
+    ]
+    return endpoints, user
+
+
+def get_clients(user):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    anonymous = APIClient()
+    authenticated = APIClient()
+    authenticated.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return anonymous, authenticated
+
+
+def make_request(endpoint, anonymous, authenticated):
+    """Функция, выполняющая один запрос к эндпоинту."""
+    client = authenticated if endpoint.authenticated else anonymous
+    method = getattr(client, endpoint.method)
+
+    def request():
+        data = endpoint.data() if endpoint.data else None
+        response = method(endpoint.url, data=data, format='json')
+        assert response.status_code < 400, (
+            endpoint.name, response.status_code
+        )
+        return response
+    return request
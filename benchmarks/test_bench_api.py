@@ -0,0 +1,41 @@
+"""Бенчмарки эндпоинтов для pytest-benchmark:
+    pytest benchmarks/test_bench_api.py --benchmark-json=api.json
+"""
+import pytest
+
+from benchmarks.common import seed
+from benchmarks.endpoints import (BENCH_SETTINGS, NO_CACHE, get_clients,
+                                  get_endpoints, make_request)
+
+pytest.importorskip('pytest_benchmark')
+
+ENDPOINT_NAMES = [
+    'titles_list', 'titles_list_category', 'titles_list_genre',
+    'titles_list_name', 'titles_list_year',
+    'titles_list_category_genre_name_year', 'titles_list_slim',
+    'title_detail', 'genres_list', 'categories_list', 'reviews_list',
+    'reviews_list_cursor', 'reviews_list_slim', 'review_detail',
+    'comments_list', 'signup', 'token', 'users_me',
+]
+
+
+@pytest.fixture(scope='module')
+def seeded(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        seed(users=300, titles=100, reviews=20000, comments=5000)
+        yield get_endpoints()
+
+
+@pytest.fixture(autouse=True)
+def bench_settings(settings):
+    for name, value in BENCH_SETTINGS.items():
+        setattr(settings, name, value)
+    settings.CACHES = NO_CACHE
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', ENDPOINT_NAMES)
+def test_endpoint(benchmark, seeded, name):
+    endpoints, user = seeded
+    endpoint = next(item for item in endpoints if item.name == name)
+    benchmark(make_request(endpoint, *get_clients(user)))
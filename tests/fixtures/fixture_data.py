@@ -0,0 +1,27 @@
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+TITLES_COUNT = 15
+
+
+@pytest.fixture
+def titles():
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    result = []
+    for i in range(TITLES_COUNT):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=2000 + i % 3,
+            category=categories[i % 3],
+        )
+        title.genre.set(genres[:i % 3 + 1])
+        result.append(title)
+    return result
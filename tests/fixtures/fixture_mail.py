@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def sync_mail_queue(settings):
+    """Письма доставляются сразу после фиксации транзакции запроса."""
+    settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'WORKER': 'sync'}
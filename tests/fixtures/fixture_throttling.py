@@ -0,0 +1,15 @@
+import pytest
+
+from api.ratelimit import reset_limiters
+from api.throttling import bucket_store
+
+
+@pytest.fixture(autouse=True)
+def clean_limiters():
+    """Счётчики попыток и корзины токенов не переходят из одного теста
+    в другой."""
+    reset_limiters()
+    bucket_store.clear()
+    yield
+    reset_limiters()
+    bucket_store.clear()
@@ -0,0 +1,164 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08Rating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_writes(self, admin_client, admin,
+                                             user_client, user):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'text', 9)
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/',
+            data={'score': 1}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        response = admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'каскадном удалении отзывов вместе с автором.'
+        )
+
+    def test_02_recompute_ratings_command(self, admin_client, admin,
+                                          user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        Title.objects.update(rating_sum=100, rating_count=1)
+        Review.objects.filter(author=user).update(score=9)
+
+        call_command('recompute_ratings')
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (14, 2), (
+            'Проверьте, что команда `recompute_ratings` восстанавливает '
+            'сумму и количество оценок по отзывам.'
+        )
+        assert Title.objects.get(pk=titles[1]['id']).rating is None
+
+    def test_03_title_stats(self, admin_client, admin, user_client, user,
+                            moderator_client, moderator, client):
+        reviews, titles = create_reviews(
+            admin_client,
+            {admin: admin_client, user: user_client,
+             moderator: moderator_client}
+        )
+        title_id = titles[0]['id']
+        admin_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/',
+            data={'score': 10}
+        )
+        admin_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/'
+        )
+        create_single_review(user_client, title_id, 'text', 1)
+
+        response = client.get(f'/api/v1/titles/{title_id}/stats/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что эндпоинт `/api/v1/titles/{title_id}/stats/` '
+            'доступен без авторизации.'
+        )
+        data = response.json()
+        assert data['histogram'] == {
+            str(score): int(score in (1, 5, 10)) for score in range(11)
+        }, (
+            'Проверьте, что гистограмма оценок обновляется при создании, '
+            'изменении и удалении отзывов.'
+        )
+        assert data['count'] == 3
+        assert data['mean'] == 16 / 3
+        assert data['median'] == 5
+        assert data['percentiles']['p90'] == 10
+
+        title = Title.objects.get(pk=title_id)
+        Title.objects.update(score_5_count=100)
+        call_command('recompute_ratings')
+        title.refresh_from_db()
+        assert title.score_histogram == [
+            int(score in (1, 5, 10)) for score in range(11)
+        ]
+
+    def test_04_stale_title_save_keeps_counters(self, admin_client, admin,
+                                                user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        stale = Title.objects.get(pk=title.pk)
+        Review.objects.create(author=user, title=title, text='Отзыв', score=8)
+        stale.name = 'Новое название'
+        stale.save()
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.pk}/', data={'description': 'Описание'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title.refresh_from_db()
+        assert title.name == 'Новое название'
+        assert (title.rating_sum, title.rating_count, title.score_8_count) == (
+            8, 1, 1
+        ), (
+            'Проверьте, что сохранение произведения, загруженного до '
+            'создания отзыва, не перезаписывает счётчики оценок.'
+        )
+        assert self.get_rating(admin_client, title.pk) == 8
+
+    def test_05_deferred_title_save(self):
+        title = Title.objects.create(
+            name='Произведение', year=2000, description='Описание'
+        )
+        partial = Title.objects.only('id', 'name').get(pk=title.pk)
+        Title.objects.filter(pk=title.pk).update(description='Изменено')
+        partial.name = 'Новое название'
+        with CaptureQueriesContext(connection) as context:
+            partial.save()
+        queries = [query['sql'] for query in context.captured_queries]
+        assert not [sql for sql in queries if 'description' in sql], (
+            'Проверьте, что сохранение не загружает отложенные поля.'
+        )
+        assert [
+            sql for sql in queries if sql.startswith('UPDATE "reviews_title"')
+        ] == [
+            'UPDATE "reviews_title" SET "name" = \'Новое название\' '
+            'WHERE "reviews_title"."id" = %d' % title.pk
+        ], (
+            'Проверьте, что сохранение произведения, загруженного через '
+            '`.only()`, записывает только загруженные поля.'
+        )
+        title.refresh_from_db()
+        assert (title.name, title.description) == (
+            'Новое название', 'Изменено'
+        ), (
+            'Проверьте, что сохранение произведения, загруженного через '
+            '`.only()`, не загружает и не перезаписывает отложенные поля.'
+        )
@@ -0,0 +1,30 @@
+import pytest
+
+LIST_QUERIES = 3
+DETAIL_QUERIES = 2
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    @pytest.mark.parametrize('query', [
+        '',
+        '?page=2',
+        '?category=category-1',
+        '?genre=genre-2',
+        '?name=Произведение 4',
+        '?year=2001',
+        '?category=category-0&genre=genre-0&year=2000',
+    ])
+    def test_01_title_list_queries(self, client, titles,
+                                   django_assert_num_queries, query):
+        with django_assert_num_queries(LIST_QUERIES):
+            response = client.get(f'/api/v1/titles/{query}')
+        assert response.status_code == 200
+
+    def test_02_title_detail_queries(self, client, titles,
+                                     django_assert_num_queries):
+        with django_assert_num_queries(DETAIL_QUERIES):
+            response = client.get(f'/api/v1/titles/{titles[-1].id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 3
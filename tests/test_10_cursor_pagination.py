@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def title_with_reviews(django_user_model):
+    title = Title.objects.create(name='Произведение', year=2000)
+    for i in range(25):
+        author = django_user_model.objects.create_user(
+            username=f'author{i}', email=f'author{i}@yamdb.fake'
+        )
+        Review.objects.create(
+            author=author, title=title, text=f'review {i}', score=i % 11
+        )
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_reviews_cursor_pages(self, client, title_with_reviews):
+        url = (
+            f'/api/v1/titles/{title_with_reviews.id}/reviews/'
+            '?pagination=cursor'
+        )
+        seen = []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            sql = ' '.join(query['sql'] for query in context.captured_queries)
+            assert 'COUNT(' not in sql and 'OFFSET' not in sql, (
+                'Проверьте, что курсорная пагинация не выполняет COUNT(*) '
+                'и OFFSET-запросы.'
+            )
+            data = response.json()
+            assert 'count' not in data
+            seen.extend(review['id'] for review in data['results'])
+            url = data['next']
+        expected = list(
+            Review.objects.filter(
+                title=title_with_reviews
+            ).order_by('-pub_date', 'id').values_list('id', flat=True)
+        )
+        assert seen == expected, (
+            'Проверьте, что курсорная пагинация отзывов возвращает все '
+            'отзывы без повторов в порядке убывания даты публикации.'
+        )
+
+    def test_02_page_number_pagination_by_default(self, client,
+                                                  title_with_reviews):
+        response = client.get(
+            f'/api/v1/titles/{title_with_reviews.id}/reviews/'
+        )
+        assert response.json()['count'] == 25
@@ -0,0 +1,34 @@
+import csv
+import os
+
+import pytest
+from django.core.management import call_command
+
+from reviews.management.commands.import_data import CSV_PATH
+from reviews.models import Review, Title
+
+
+def count_rows(filename):
+    with open(os.path.join(CSV_PATH, filename), newline='') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ImportData:
+
+    def test_01_import_and_resume(self):
+        call_command('import_data', batch_size=7)
+        assert Review.objects.count() == count_rows('review.csv')
+        assert Title.genre.through.objects.count() == count_rows(
+            'genre_title.csv'
+        ), 'Проверьте, что команда загружает связи произведений и жанров.'
+        title = Title.objects.filter(rating_count__gt=0).first()
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после загрузки рейтинги пересчитываются.'
+        )
+
+        call_command('import_data', batch_size=7, resume=True)
+        assert Review.objects.count() == count_rows('review.csv'), (
+            'Проверьте, что повторная загрузка с `--resume` пропускает '
+            'уже загруженные строки.'
+        )
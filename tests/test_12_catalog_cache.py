@@ -0,0 +1,73 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Genre, Review, Title
+from tests.utils import create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12CatalogCache:
+
+    def test_01_cached_list_and_invalidation(self, client, admin_client,
+                                             django_assert_num_queries):
+        genres = create_genre(admin_client)
+        url = '/api/v1/genres/'
+        response = client.get(url)
+        assert response.json()['count'] == len(genres)
+
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.json()['count'] == len(genres), (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из кэша.'
+        )
+
+        admin_client.delete(f'{url}{genres[0]["slug"]}/')
+        response = client.get(url)
+        assert response.json()['count'] == len(genres) - 1, (
+            'Проверьте, что кэш каталога сбрасывается при изменении данных.'
+        )
+
+    def test_02_etag(self, client, admin_client):
+        create_genre(admin_client)
+        url = '/api/v1/genres/'
+        etag = client.get(url)['ETag']
+        assert etag
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        admin_client.post(url, data={'name': 'Мюзикл', 'slug': 'musical'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response['ETag'] != etag
+
+    def test_03_key_includes_host(self, client, admin_client):
+        for index in range(11):
+            Genre.objects.create(name=f'Жанр {index}', slug=f'genre-{index}')
+        url = '/api/v1/genres/'
+        client.get(url, HTTP_HOST='a.example')
+        response = client.get(url, HTTP_HOST='b.example')
+        assert response.json()['next'].startswith('http://b.example/'), (
+            'Проверьте, что ссылки пагинации из кэша построены для хоста '
+            'текущего запроса.'
+        )
+
+    def test_04_commands_reset_cache(self, client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = '/api/v1/titles/'
+        assert client.get(url).json()['results'][0]['rating'] is None
+        Review.objects.bulk_create(
+            [Review(author=user, title=title, text='Отзыв', score=7)]
+        )
+        call_command('recompute_ratings', stdout=StringIO())
+        assert client.get(url).json()['results'][0]['rating'] == 7, (
+            'Проверьте, что пересчёт рейтингов сбрасывает кэш каталога.'
+        )
+        Title.objects.filter(pk=title.pk).update(name='Без сигналов')
+        call_command('compact_leaderboards', stdout=StringIO())
+        assert client.get(url).json()['results'][0]['name'] == (
+            'Без сигналов'
+        ), 'Проверьте, что перестройка рейтингов сбрасывает кэш каталога.'
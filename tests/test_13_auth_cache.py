@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13AuthUserCache:
+
+    def test_01_me_without_user_query(self, user_client,
+                                      django_assert_num_queries):
+        user_client.get('/api/v1/users/me/')
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['bio'] == 'user bio'
+
+    def test_02_role_change_invalidates_cache(self, admin_client, user,
+                                              user_client):
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что изменение роли пользователя сбрасывает '
+            'закэшированные данные аутентификации.'
+        )
+
+    def test_03_deactivated_user_rejected(self, user, user_client):
+        user_client.get('/api/v1/users/me/')
+        user.is_active = False
+        user.save()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_04_me_patch_keeps_other_fields(self, user, user_client):
+        user_client.get('/api/v1/users/me/')
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'first_name': 'Имя'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.first_name == 'Имя'
+        assert user.check_password('1234567')
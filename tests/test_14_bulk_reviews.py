@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import LeaderboardEntry, Review, Title
+from reviews.ratings import apply_created_reviews
+
+
+@pytest.fixture
+def titles():
+    return [
+        Title.objects.create(name=f'Произведение {i}', year=2000)
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14BulkReviews:
+
+    def test_01_title_bulk(self, user_client, user, titles,
+                           django_assert_max_num_queries):
+        Review.objects.create(author=user, title=titles[1], score=1)
+        url = f'/api/v1/titles/{titles[0].id}/reviews/bulk/'
+        data = [
+            {'text': 'первый', 'score': 8},
+            {'text': 'дубль', 'score': 6},
+            {'text': 'плохая оценка', 'score': 11},
+        ]
+        with django_assert_max_num_queries(9):
+            response = user_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{url}` создаёт отзывы пачкой.'
+        )
+        results = response.json()
+        assert [item['status'] for item in results] == [201, 400, 400]
+        assert Review.objects.get(pk=results[0]['id']).text == 'первый'
+        assert Title.objects.get(pk=titles[0].id).rating == 8, (
+            'Проверьте, что пакетное создание отзывов обновляет рейтинг.'
+        )
+
+    def test_02_cross_title_bulk(self, user_client, user, titles, client):
+        Review.objects.create(author=user, title=titles[1], score=1)
+        data = [
+            {'title': titles[0].id, 'text': 'a', 'score': 4},
+            {'title': titles[1].id, 'text': 'b', 'score': 5},
+            {'title': titles[2].id, 'text': 'c', 'score': 6},
+            {'title': 100500, 'text': 'd', 'score': 7},
+        ]
+        response = user_client.post(
+            '/api/v1/reviews/bulk/', data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert [item['status'] for item in response.json()] == [
+            201, 400, 201, 400
+        ]
+        assert Review.objects.filter(author=user).count() == 3
+
+        response = client.post(
+            '/api/v1/reviews/bulk/', data=data, content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_03_bulk_ratings_single_update(self, user, admin, titles):
+        def create(title, score, author):
+            return Review.objects.bulk_create(
+                [Review(author=author, title=title, text='t', score=score)]
+            )[0]
+
+        review = create(titles[0], 3, user)
+        with CaptureQueriesContext(connection) as one_title:
+            apply_created_reviews([review])
+        reviews = [
+            create(titles[0], 7, admin),
+            create(titles[1], 10, user),
+            create(titles[2], 0, user),
+        ]
+        with CaptureQueriesContext(connection) as many_titles:
+            apply_created_reviews(reviews)
+        assert len(many_titles) == len(one_title), (
+            'Проверьте, что пакетный учёт отзывов не делает отдельный '
+            'UPDATE на каждое произведение.'
+        )
+        expected = {
+            titles[0].id: (10, 2, 1, 1),
+            titles[1].id: (10, 1, 0, 0),
+            titles[2].id: (0, 1, 0, 0),
+        }
+        for title in Title.objects.filter(pk__in=expected):
+            assert (
+                title.rating_sum, title.rating_count,
+                title.score_3_count, title.score_7_count,
+            ) == expected[title.id], (
+                'Проверьте, что пакетный учёт отзывов обновляет сумму, '
+                'количество и гистограмму оценок каждого произведения.'
+            )
+        for entry in LeaderboardEntry.objects.filter(title__in=titles):
+            assert (
+                entry.rating_sum, entry.rating_count
+            ) == expected[entry.title_id][:2], (
+                'Проверьте, что пакетный учёт отзывов обновляет рейтинги.'
+            )
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+from django.urls import resolve
+
+from api.async_views import with_async_reads
+from api.metrics import DB_QUERIES, HISTOGRAMS
+from api.middleware import MetricsMiddleware
+from api.urls import router_v1
+from reviews.models import Title
+
+
+@pytest.fixture
+def metrics_settings(settings):
+    settings.METRICS = {'ENABLED': True, 'SLOW_REQUEST_MS': 0}
+    settings.MIDDLEWARE = [
+        'api.middleware.MetricsMiddleware', *settings.MIDDLEWARE
+    ]
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+    yield settings
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Metrics:
+
+    def test_01_metrics_disabled_by_default(self, client):
+        assert client.get('/metrics/').status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_route_histograms(self, client, metrics_settings, caplog):
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        response = client.get('/metrics/')
+        assert response.status_code == HTTPStatus.OK
+        text = response.content.decode()
+        assert (
+            'api_request_duration_seconds_count{route="TitleViewSet.list",'
+            'method="GET"} 2'
+        ) in text, (
+            'Проверьте, что метрики собираются по маршрутам вьюсетов.'
+        )
+        assert 'api_request_db_queries_bucket{route="TitleViewSet.list"' in (
+            text
+        )
+        assert any(
+            'TitleViewSet.list' in record.getMessage()
+            for record in caplog.records
+        ), 'Проверьте, что медленные запросы логируются вместе с SQL.'
+
+    def test_03_async_reads_count_queries(self, metrics_settings):
+        Title.objects.create(name='Произведение', year=2000)
+        view = next(
+            pattern.callback for pattern in with_async_reads(router_v1.urls)
+            if pattern.name == 'titles-list'
+        )
+        # Так Django вызывает асинхронное представление из синхронного
+        # промежуточного слоя под ASGI.
+        middleware = MetricsMiddleware(async_to_sync(view))
+        request = AsyncRequestFactory().get('/api/v1/titles/')
+        request.resolver_match = resolve('/api/v1/titles/')
+        assert middleware(request).status_code == HTTPStatus.OK
+        samples = dict(
+            line.rsplit(' ', 1) for line in DB_QUERIES.collect()
+            if not line.startswith('#')
+        )
+        assert float(samples[
+            'api_request_db_queries_sum{route="TitleViewSet.list",'
+            'method="GET"}'
+        ]) > 0, (
+            'Проверьте, что запросы к БД асинхронных обработчиков чтения '
+            'учитываются в метриках.'
+        )
@@ -0,0 +1,41 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+
+from api.async_views import with_async_reads
+from api.urls import router_v1
+from reviews.models import Title
+
+
+def get_async_view(name):
+    return next(
+        pattern.callback for pattern in with_async_reads(router_v1.urls)
+        if pattern.name == name
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16AsyncReads:
+
+    def test_01_only_catalog_and_reviews_wrapped(self):
+        for pattern in with_async_reads(router_v1.urls):
+            wrapped = asyncio.iscoroutinefunction(pattern.callback)
+            expected = pattern.name.split('-')[0] in (
+                'titles', 'genres', 'categories', 'reviews', 'comments'
+            )
+            assert wrapped == expected, pattern.name
+
+    def test_02_async_title_list(self):
+        Title.objects.create(name='Произведение', year=2000)
+        view = get_async_view('titles-list')
+        response = async_to_sync(view)(
+            AsyncRequestFactory().get('/api/v1/titles/')
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert b'"count":1' in response.content, (
+            'Проверьте, что асинхронный обработчик возвращает тот же '
+            'ответ, что и вьюсет.'
+        )
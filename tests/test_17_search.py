@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews import search
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def documents(user, admin):
+    matrix = Title.objects.create(
+        name='Матрица', year=1999, description='Фильм про избранного'
+    )
+    other = Title.objects.create(name='Терминатор', year=1984)
+    review = Review.objects.create(
+        author=user, title=other, score=7,
+        text='Лучше, чем Матрица. Матрица скучная, а здесь погони.'
+    )
+    Review.objects.create(
+        author=admin, title=matrix, score=9, text='Отличный фильм'
+    )
+    comment = Comment.objects.create(
+        author=admin, review=review, text='Не согласен про Матрица'
+    )
+    return matrix, review, comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Search:
+
+    def test_01_search_ranked(self, client, documents):
+        matrix, review, comment = documents
+        response = client.get('/api/v1/search/', {'q': 'матрица'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 3, (
+            'Проверьте, что поиск находит произведения, отзывы и '
+            'комментарии.'
+        )
+        found = {(item['type'], item['id']) for item in data['results']}
+        assert found == {
+            ('title', matrix.id), ('review', review.id),
+            ('comment', comment.id),
+        }
+        assert data['results'][0] == {
+            'type': 'review', 'id': review.id, 'title_id': review.title_id,
+            'review_id': None, 'score': data['results'][0]['score'],
+        }, 'Проверьте, что результаты поиска ранжируются.'
+
+        response = client.get(
+            '/api/v1/search/', {'q': 'матрица', 'type': 'comment'}
+        )
+        assert [item['id'] for item in response.json()['results']] == [
+            comment.id
+        ]
+
+    def test_02_index_follows_writes(self, client, documents):
+        matrix, review, _ = documents
+        review.delete()
+        matrix.name = 'Матрица: Перезагрузка'
+        matrix.save()
+        response = client.get('/api/v1/search/', {'q': 'перезагрузка'})
+        assert [item['id'] for item in response.json()['results']] == [
+            matrix.id
+        ]
+        response = client.get('/api/v1/search/', {'q': 'погони'})
+        assert response.json()['count'] == 0, (
+            'Проверьте, что индекс поиска обновляется при удалении.'
+        )
+
+    def test_03_memory_index(self, documents):
+        matrix, review, comment = documents
+        index = search.MemorySearchIndex()
+        results = index.search(['матрица'])
+        assert [item['id'] for item in results][0] == review.id
+        assert len(results) == 3
+        assert [item['id'] for item in index.search(
+            ['матрица'], search.COMMENT
+        )] == [comment.id]
+        index.remove(search.TITLE, matrix.id)
+        assert len(index.search(['матрица'])) == 2
@@ -0,0 +1,110 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.leaderboards import get_prior
+from reviews.models import LeaderboardEntry
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Leaderboard:
+    url = '/api/v1/titles/top/'
+
+    def get_top(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает '
+            'ответ со статусом 200.'
+        )
+        return [title['id'] for title in response.json()]
+
+    def create_data(self, admin_client, user_client):
+        titles, categories, genres = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        create_single_review(admin_client, first, 'text', 6)
+        create_single_review(user_client, first, 'text', 4)
+        create_single_review(admin_client, second, 'text', 9)
+        return first, second, categories, genres
+
+    def test_01_top_titles(self, admin_client, user_client):
+        first, second, categories, genres = self.create_data(
+            admin_client, user_client
+        )
+        assert self.get_top(admin_client) == [second, first], (
+            f'Проверьте, что `{self.url}` возвращает произведения по '
+            'убыванию рейтинга.'
+        )
+        assert self.get_top(admin_client, genre=genres[0]['slug']) == [
+            first
+        ], 'Проверьте фильтрацию рейтинга по жанру.'
+        assert self.get_top(
+            admin_client, category=categories[1]['slug']
+        ) == [second], 'Проверьте фильтрацию рейтинга по категории.'
+        assert self.get_top(
+            admin_client, genre=genres[0]['slug'],
+            category=categories[1]['slug']
+        ) == [], 'Проверьте одновременную фильтрацию по жанру и категории.'
+        assert self.get_top(admin_client, year=1988) == [second], (
+            'Проверьте фильтрацию рейтинга по году.'
+        )
+        assert self.get_top(admin_client, min_reviews=2) == [first], (
+            'Проверьте, что параметр `min_reviews` исключает произведения '
+            'с меньшим числом отзывов.'
+        )
+        assert self.get_top(admin_client, limit=1) == [second], (
+            'Проверьте, что параметр `limit` ограничивает размер рейтинга.'
+        )
+        assert self.get_top(admin_client, genre='unknown') == [], (
+            'Проверьте, что для несуществующего жанра рейтинг пуст.'
+        )
+        response = admin_client.get(self.url, {'limit': 1000})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что слишком большой `limit` отклоняется.'
+        )
+
+    def test_02_incremental_updates(self, admin_client, user_client):
+        first, second, categories, genres = self.create_data(
+            admin_client, user_client
+        )
+        response = admin_client.patch(
+            f'/api/v1/titles/{second}/', data={'genre': [genres[0]['slug']]}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_top(admin_client, genre=genres[0]['slug']) == [
+            second, first
+        ], 'Проверьте, что смена жанров переносит произведение в рейтинги.'
+        assert self.get_top(admin_client, genre=genres[2]['slug']) == [], (
+            'Проверьте, что смена жанров удаляет произведение из рейтинга '
+            'прежнего жанра.'
+        )
+
+        create_single_review(user_client, second, 'text', 1)
+        assert self.get_top(admin_client) == [first, second], (
+            'Проверьте, что новые отзывы обновляют рейтинг лучших '
+            'произведений.'
+        )
+
+        weight, mean = get_prior()
+        for entry in LeaderboardEntry.objects.all():
+            assert entry.bayesian_rating == pytest.approx(
+                (entry.rating_sum + weight * mean)
+                / (entry.rating_count + weight)
+            ), 'Проверьте расчёт байесовского рейтинга.'
+
+        def snapshot():
+            return sorted(LeaderboardEntry.objects.values_list(
+                'scope', 'scope_id', 'title_id', 'title_category_id',
+                'rating_sum', 'rating_count', 'rating'
+            ))
+
+        incremental = snapshot()
+        call_command('compact_leaderboards')
+        assert snapshot() == incremental, (
+            'Проверьте, что инкрементально обновлённые рейтинги совпадают '
+            'с перестроенными командой `compact_leaderboards`.'
+        )
+        assert self.get_top(admin_client, bayesian='true') == [
+            first, second
+        ], 'Проверьте сортировку по байесовскому рейтингу.'
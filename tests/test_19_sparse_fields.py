@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19SparseFields:
+    url = '/api/v1/titles/'
+
+    def test_01_title_fields(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url, {'fields': 'id,name,rating'})
+        assert response.status_code == HTTPStatus.OK
+        result = response.json()['results'][0]
+        assert set(result) == {'id', 'name', 'rating'}, (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что без поля `genre` жанры не загружаются.'
+        )
+        select = context.captured_queries[-1]['sql']
+        assert 'description' not in select and 'reviews_category' not in (
+            select
+        ), 'Проверьте, что из БД читаются только нужные столбцы.'
+
+    def test_02_title_expand(self, client, titles):
+        title = titles[-1]
+        url = f'{self.url}{title.id}/'
+        response = client.get(url, {'fields': 'id,genre,category'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'id': title.id,
+            'genre': ['genre-0', 'genre-1', 'genre-2'],
+            'category': title.category.slug,
+        }, 'Проверьте, что без `expand` связанные объекты отдаются slug-ами.'
+
+        response = client.get(
+            url, {'fields': 'id,genre,category', 'expand': 'category'}
+        )
+        assert response.json()['category'] == {
+            'name': title.category.name, 'slug': title.category.slug
+        }, 'Проверьте, что `expand` возвращает вложенный объект.'
+        assert response.json()['genre'] == ['genre-0', 'genre-1', 'genre-2']
+
+        full = client.get(url).json()
+        assert set(full) == {
+            'id', 'name', 'year', 'description', 'genre', 'category',
+            'rating'
+        }, 'Проверьте, что без `fields` ответ не изменился.'
+
+        response = client.get(url, {'fields': 'id,unknown'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестные поля в `fields` отклоняются.'
+        )
+
+    def test_03_review_fields(self, admin, admin_client, titles):
+        title = titles[0]
+        Review.objects.create(author=admin, title=title, text='text',
+                              score=7)
+        url = f'{self.url}{title.id}/reviews/'
+        response = admin_client.get(url, {'fields': 'id,score,author'})
+        assert response.status_code == HTTPStatus.OK
+        result = response.json()['results'][0]
+        assert result == {
+            'id': result['id'], 'score': 7, 'author': admin.username
+        }, 'Проверьте параметр `fields` для отзывов.'
+
+        response = admin_client.get(
+            url, {'fields': 'id,score', 'pagination': 'cursor'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [
+            {'id': result['id'], 'score': 7}
+        ], 'Проверьте параметр `fields` с курсорной пагинацией.'
+
+        response = admin_client.post(
+            f'{url}?fields=id', data={'text': 'повтор', 'score': 1}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что `fields` не влияет на запись данных.'
+        )
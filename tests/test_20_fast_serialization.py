@@ -0,0 +1,73 @@
+import pytest
+
+from api.cache import bump_generation
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def reviews(titles, admin, user, moderator):
+    title = titles[-1]
+    title.description = 'Описание'
+    title.save()
+    Title.objects.create(name='Без категории', year=2001)
+    result = [
+        Review.objects.create(author=author, title=title, text=f'Отзыв {i}',
+                              score=i + 3)
+        for i, author in enumerate((admin, user, moderator))
+    ]
+    for i, author in enumerate((admin, user)):
+        Comment.objects.create(author=author, review=result[0],
+                               text=f'Комментарий {i}')
+    return title, result
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20FastSerialization:
+
+    def get_both(self, client, settings, url):
+        settings.FAST_READ_SERIALIZERS = False
+        bump_generation()
+        slow = client.get(url)
+        settings.FAST_READ_SERIALIZERS = True
+        bump_generation()
+        fast = client.get(url)
+        return slow, fast
+
+    @pytest.mark.parametrize('query', [
+        '', '?page=2', '?genre=genre-2', '?fields=id,name,rating',
+        '?fields=id,genre,category', '?fields=genre,category&expand=genre',
+    ])
+    def test_01_titles_identical(self, client, settings, reviews, query):
+        slow, fast = self.get_both(client, settings, f'/api/v1/titles/{query}')
+        assert fast.status_code == slow.status_code == 200
+        assert fast.content == slow.content, (
+            'Проверьте, что быстрая сериализация списка произведений '
+            'возвращает тот же ответ, что и сериализатор.'
+        )
+
+    @pytest.mark.parametrize('query', [
+        '', '?pagination=cursor', '?fields=id,author',
+    ])
+    def test_02_reviews_and_comments_identical(self, client, settings,
+                                               reviews, query):
+        title, title_reviews = reviews
+        for url in (
+            f'/api/v1/titles/{title.id}/reviews/{query}',
+            f'/api/v1/titles/{title.id}/reviews/{title_reviews[0].id}'
+            f'/comments/{query}',
+        ):
+            slow, fast = self.get_both(client, settings, url)
+            assert fast.status_code == slow.status_code == 200
+            assert fast.content == slow.content, (
+                f'Проверьте, что быстрая сериализация `{url}` возвращает '
+                'тот же ответ, что и сериализатор.'
+            )
+
+    def test_03_fast_path_queries(self, client, settings, reviews,
+                                  django_assert_num_queries):
+        title, _ = reviews
+        settings.FAST_READ_SERIALIZERS = True
+        # Произведение, отзывы одним запросом с авторами и COUNT(*).
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
@@ -0,0 +1,104 @@
+import io
+import json
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONParser, FastJSONRenderer
+from reviews.models import Title
+
+DATA = {
+    'count': 2,
+    'next': None,
+    'results': [
+        {
+            'id': 1,
+            'text': 'Отзыв со строкой\u2028и абзацем\u2029',
+            'score': 7,
+            'rating': 5.333333333333333,
+            'pub_date': datetime(2020, 1, 1, 12, 30, tzinfo=timezone.utc),
+            'genre': [{'name': 'Драма', 'slug': 'drama'}],
+            'histogram': {0: 1, 10: 2},
+        },
+        {
+            'id': 2,
+            'text': '"кавычки" и \\ слеш',
+            'score': None,
+            'rating': 1.0,
+            'pub_date': datetime(
+                2021, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc
+            ),
+            'genre': [],
+            'histogram': {},
+        },
+    ],
+}
+
+
+class Test21JSONRenderer:
+
+    def test_01_render_identical(self):
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(
+            DATA
+        ), (
+            'Проверьте, что FastJSONRenderer возвращает те же байты, что '
+            'и стандартный JSONRenderer.'
+        )
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_02_indent_and_big_numbers(self):
+        context = {'indent': 4}
+        assert FastJSONRenderer().render(
+            DATA, renderer_context=context
+        ) == JSONRenderer().render(DATA, renderer_context=context)
+        data = {'id': 2 ** 70}
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data
+        ), 'Проверьте запасной вариант для чисел больше 64 бит.'
+
+    def test_03_iter_render(self):
+        items = [dict(DATA['results'][i % 2], id=i) for i in range(7)]
+        expected = JSONRenderer().render(items)
+        for chunk_size in (1, 3, 7, 100):
+            assert b''.join(
+                FastJSONRenderer().iter_render(items, chunk_size)
+            ) == expected, 'Проверьте потоковое кодирование списков.'
+        assert b''.join(FastJSONRenderer().iter_render([], 3)) == b'[]'
+
+    def test_04_parser(self):
+        payload = {'text': 'Отзыв', 'score': 7, 'items': [1, None, True]}
+        parsed = FastJSONParser().parse(
+            io.BytesIO(json.dumps(payload).encode())
+        )
+        assert parsed == payload
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"text": '))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21StreamingResponse:
+
+    def test_01_bulk_reviews_stream(self, user_client, settings):
+        settings.JSON_STREAM_CHUNK_SIZE = 2
+        titles = [
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(5)
+        ]
+        data = [
+            {'title': title.id, 'text': 'текст', 'score': 5}
+            for title in titles
+        ]
+        response = user_client.post(
+            '/api/v1/reviews/bulk/', data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.streaming, (
+            'Проверьте, что длинный список результатов отдаётся потоком.'
+        )
+        results = json.loads(b''.join(response.streaming_content))
+        assert [result['status'] for result in results] == [
+            HTTPStatus.CREATED
+        ] * len(titles)
@@ -0,0 +1,133 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, LeaderboardEntry, Title
+
+
+@pytest.fixture
+def catalog():
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(2)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    return categories, genres
+
+
+def title_data(number, genres=('genre-0', 'genre-1')):
+    return {
+        'name': f'Новинка {number}',
+        'year': 2000 + number % 20,
+        'description': f'Описание {number}',
+        'genre': list(genres),
+        'category': 'category-0',
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22BulkTitles:
+    url = '/api/v1/titles/bulk/'
+
+    def post(self, client, data):
+        return client.post(self.url, data=data, format='json')
+
+    def test_01_bulk_create(self, admin_client, catalog):
+        existing = Title.objects.create(name='Старое', year=1990)
+        existing.genre.set(catalog[1][2:])
+        admin_client.get('/api/v1/titles/')
+        data = [
+            title_data(1),
+            {**title_data(2), 'genre': ['genre-0', 'unknown']},
+            {**title_data(3), 'category': 'unknown'},
+            {'year': 2000},
+            {'id': existing.id, 'name': 'Обновлённое', 'genre': ['genre-1']},
+            {'id': 10 ** 6, 'name': 'Нет такого'},
+            title_data(4, genres=['genre-2']),
+        ]
+        response = self.post(admin_client, data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.url}` '
+            'создаёт произведения пачкой.'
+        )
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            201, 400, 400, 400, 200, 400, 201
+        ], 'Проверьте статусы элементов пакетной записи.'
+        assert set(results[1]['errors']) == {'genre'}
+        assert set(results[2]['errors']) == {'category'}
+        assert 'name' in results[3]['errors']
+        assert set(results[5]['errors']) == {'id'}
+
+        created = Title.objects.get(pk=results[0]['id'])
+        assert created.name == 'Новинка 1'
+        assert created.category.slug == 'category-0'
+        assert sorted(created.genre.values_list('slug', flat=True)) == [
+            'genre-0', 'genre-1'
+        ], 'Проверьте, что связи с жанрами созданы.'
+        assert list(Title.objects.get(
+            pk=results[6]['id']
+        ).genre.values_list('slug', flat=True)) == ['genre-2']
+
+        existing.refresh_from_db()
+        assert (existing.name, existing.year) == ('Обновлённое', 1990), (
+            'Проверьте, что изменяются только переданные поля.'
+        )
+        assert list(existing.genre.values_list('slug', flat=True)) == [
+            'genre-1'
+        ], 'Проверьте, что жанры изменённого произведения заменяются.'
+
+        names = [
+            title['name']
+            for title in admin_client.get('/api/v1/titles/').json()['results']
+        ]
+        assert 'Новинка 1' in names and 'Обновлённое' in names, (
+            'Проверьте, что пакетная запись сбрасывает кэш каталога.'
+        )
+        assert set(LeaderboardEntry.objects.filter(
+            title_id=created.id
+        ).values_list('scope', 'scope_id')) == {
+            (LeaderboardEntry.ALL, 0),
+            (LeaderboardEntry.CATEGORY, catalog[0][0].id),
+            (LeaderboardEntry.GENRE, catalog[1][0].id),
+            (LeaderboardEntry.GENRE, catalog[1][1].id),
+        }, 'Проверьте, что новые произведения попадают в рейтинги.'
+        response = admin_client.get('/api/v1/search/', {'q': 'Новинка'})
+        assert response.json()['count'] == 2, (
+            'Проверьте, что новые произведения находятся поиском.'
+        )
+
+    def test_02_queries_do_not_grow(self, admin_client, catalog):
+        def count_queries(size, offset):
+            with CaptureQueriesContext(connection) as context:
+                response = self.post(admin_client, [
+                    title_data(offset + i) for i in range(size)
+                ])
+            assert response.status_code == HTTPStatus.CREATED
+            return len(context.captured_queries)
+
+        count_queries(1, 1000)
+        assert count_queries(2, 0) == count_queries(50, 100), (
+            'Проверьте, что число запросов не зависит от размера пачки.'
+        )
+        assert Title.objects.count() == 53
+
+    def test_03_permissions_and_limits(self, user_client, admin_client,
+                                       settings, catalog):
+        response = self.post(user_client, [title_data(1)])
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пакетная запись доступна только администратору.'
+        )
+        settings.TITLES_BULK_MAX_ITEMS = 2
+        for data in ([], {'name': 'x'}, [title_data(i) for i in range(3)]):
+            response = self.post(admin_client, data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = self.post(admin_client, [{'name': 'x'}])
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что пачка без удачных элементов возвращает 400.'
+        )
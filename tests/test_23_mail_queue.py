@@ -0,0 +1,112 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from api.mail import deliver_pending, enqueue_mail, mail_worker
+from api.metrics import MAIL_DELIVERIES
+from reviews.models import OutboundEmail
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('Почтовый сервер недоступен')
+
+
+def signup(client, number=0):
+    return client.post('/api/v1/auth/signup/', data={
+        'email': f'user{number}@yamdb.fake', 'username': f'user{number}'
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23MailQueue:
+
+    def test_01_signup_enqueues_mail(self, client):
+        response = signup(client)
+        assert response.status_code == HTTPStatus.OK
+        message = OutboundEmail.objects.get()
+        assert message.to == 'user0@yamdb.fake'
+        assert message.sent_at is not None, (
+            'Проверьте, что письмо из очереди отправлено после регистрации.'
+        )
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].subject == 'Код подтверждения YaMDb', (
+            'Проверьте тему письма с кодом подтверждения.'
+        )
+        assert 'user0' in mail.outbox[0].body
+
+    def test_02_failed_delivery_retries(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_23_mail_queue.FailingBackend'
+        response = signup(client)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ошибка почтового сервера не ломает регистрацию.'
+        )
+        message = OutboundEmail.objects.get()
+        assert message.sent_at is None
+        assert message.attempts == 1
+        assert 'недоступен' in message.last_error
+        assert message.next_attempt_at > timezone.now() + timedelta(
+            seconds=settings.MAIL_QUEUE['RETRY_DELAY'] - 5
+        ), 'Проверьте задержку перед повторной попыткой.'
+
+        assert deliver_pending() == (0, 0), (
+            'Проверьте, что письмо не отправляется раньше срока.'
+        )
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        assert deliver_pending() == (1, 0)
+        assert len(mail.outbox) == 1
+
+    def test_03_attempts_limit(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_23_mail_queue.FailingBackend'
+        settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'MAX_ATTEMPTS': 2}
+        enqueue_mail('Тема', 'Текст', 'user@yamdb.fake')
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        assert deliver_pending() == (0, 1)
+        assert deliver_pending() == (0, 0), (
+            'Проверьте, что после последней попытки письмо не отправляется.'
+        )
+        assert OutboundEmail.objects.get().attempts == 2
+
+    def test_04_command_batches(self, settings):
+        settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'WORKER': 'command'}
+        for i in range(5):
+            enqueue_mail('Тема', f'Текст {i}', f'user{i}@yamdb.fake')
+        assert not mail.outbox, (
+            'Проверьте, что в режиме command письма ждут обработчик.'
+        )
+        call_command('send_queued_mail', once=True, batch_size=2)
+        assert len(mail.outbox) == 5
+        assert not OutboundEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_05_thread_worker(self, settings):
+        settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'WORKER': 'thread'}
+        enqueue_mail('Тема', 'Текст', 'user@yamdb.fake')
+        deadline = time.monotonic() + 5
+        while not mail.outbox and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что фоновый поток доставляет письма.'
+        )
+        assert mail_worker._thread.daemon
+
+    def test_06_metrics(self, client, settings):
+        settings.METRICS = {'ENABLED': True, 'SLOW_REQUEST_MS': 1000}
+        MAIL_DELIVERIES.clear()
+        settings.MAIL_QUEUE = {**settings.MAIL_QUEUE, 'WORKER': 'command'}
+        enqueue_mail('Тема', 'Текст', 'user@yamdb.fake')
+        text = client.get('/metrics/').content.decode()
+        assert 'api_mail_queue_messages{state="pending"} 1' in text, (
+            'Проверьте метрику глубины очереди писем.'
+        )
+        deliver_pending()
+        text = client.get('/metrics/').content.decode()
+        assert 'api_mail_deliveries_total{result="sent"} 1' in text
+        assert 'api_mail_queue_messages{state="pending"} 0' in text
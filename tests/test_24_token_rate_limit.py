@@ -0,0 +1,159 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import int_to_base36
+
+from api.ratelimit import (CacheSlidingWindowLimiter, SlidingWindowLimiter,
+                           is_plausible_code)
+
+URL = '/api/v1/auth/token/'
+
+
+class Clock:
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Test24Limiters:
+
+    def check_limiter(self, limiter, clock):
+        for _ in range(3):
+            assert limiter.retry_after('user') is None
+            limiter.hit('user')
+        assert limiter.retry_after('user') > 0, (
+            'Проверьте, что лимит срабатывает после исчерпания попыток.'
+        )
+        assert limiter.retry_after('other') is None
+        clock.now += 25
+        assert limiter.retry_after('user') is None, (
+            'Проверьте, что старые попытки выходят из окна.'
+        )
+
+    def test_01_memory_limiter(self):
+        clock = Clock()
+        self.check_limiter(SlidingWindowLimiter(3, 10, clock=clock), clock)
+
+    def test_02_cache_limiter(self):
+        clock = Clock()
+        self.check_limiter(
+            CacheSlidingWindowLimiter(3, 10, 'default', clock=clock), clock
+        )
+
+    def test_03_plausible_code(self):
+        generator = default_token_generator
+        now = generator._num_seconds(generator._now())
+        assert is_plausible_code(f'{int_to_base36(now)}-{"a" * 32}')
+        assert is_plausible_code(f'{int_to_base36(now)}-{"a" * 20}')
+        for code in ('12345', f'{int_to_base36(now)}-{"z" * 32}',
+                     f'{int_to_base36(now - 10 ** 7)}-{"a" * 32}'):
+            assert not is_plausible_code(code), (
+                'Проверьте, что неверный формат и просроченная метка времени '
+                'отклоняются без обращения к БД.'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TokenRateLimit:
+
+    def post(self, client, username, code='12345', ip='127.0.0.1'):
+        return client.post(URL, data={
+            'username': username, 'confirmation_code': code
+        }, REMOTE_ADDR=ip)
+
+    def test_01_username_limit(self, client, user, settings):
+        settings.TOKEN_RATE_LIMIT = {
+            **settings.TOKEN_RATE_LIMIT, 'USERNAME_ATTEMPTS': 3
+        }
+        for _ in range(3):
+            response = self.post(client, user.username)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(client, user.username)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что лишние попытки получить токен отклоняются.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert not context.captured_queries, (
+            'Проверьте, что лишние попытки отклоняются без запросов к БД.'
+        )
+        response = self.post(client, 'other')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что лимит по username не действует на другие имена.'
+        )
+
+    def test_02_ip_limit(self, client, settings):
+        settings.TOKEN_RATE_LIMIT = {
+            **settings.TOKEN_RATE_LIMIT, 'IP_ATTEMPTS': 3
+        }
+        for i in range(3):
+            assert self.post(client, f'user{i}').status_code == (
+                HTTPStatus.NOT_FOUND
+            )
+        assert self.post(client, 'user4').status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        ), 'Проверьте лимит попыток с одного IP-адреса.'
+        assert self.post(client, 'user4', ip='10.0.0.1').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+
+    def test_03_valid_code(self, client, user, settings):
+        settings.TOKEN_RATE_LIMIT = {
+            **settings.TOKEN_RATE_LIMIT, 'USERNAME_ATTEMPTS': 2
+        }
+        self.post(client, user.username)
+        code = default_token_generator.make_token(user)
+        for _ in range(3):
+            response = self.post(client, user.username, code)
+            assert response.status_code == HTTPStatus.CREATED, (
+                'Проверьте, что удачные попытки не расходуют лимит.'
+            )
+            assert 'token' in response.json()
+
+    def test_04_malformed_code_skips_user_fetch(self, client, user):
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(client, user.username)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert len(context.captured_queries) == 1
+        assert 'password' not in context.captured_queries[0]['sql'], (
+            'Проверьте, что для кода неверного формата строка пользователя '
+            'не читается.'
+        )
+
+    def test_05_disabled(self, client, user, settings):
+        settings.TOKEN_RATE_LIMIT = {
+            **settings.TOKEN_RATE_LIMIT, 'ENABLED': False,
+            'USERNAME_ATTEMPTS': 1,
+        }
+        for _ in range(3):
+            response = self.post(client, user.username)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_06_ip_behind_proxy(self, client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'NUM_PROXIES': 1
+        }
+        settings.TOKEN_RATE_LIMIT = {
+            **settings.TOKEN_RATE_LIMIT, 'IP_ATTEMPTS': 2
+        }
+        for i in range(2):
+            client.post(URL, data={
+                'username': f'user{i}', 'confirmation_code': '12345'
+            }, HTTP_X_FORWARDED_FOR='10.0.0.1')
+        response = client.post(URL, data={
+            'username': 'user3', 'confirmation_code': '12345'
+        }, HTTP_X_FORWARDED_FOR='10.0.0.2')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что лимит по IP определяет адрес клиента так же, '
+            'как ограничители частоты DRF.'
+        )
+        response = client.post(URL, data={
+            'username': 'user3', 'confirmation_code': '12345'
+        }, HTTP_X_FORWARDED_FOR='10.0.0.1')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
@@ -0,0 +1,81 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+from django.db import connection
+from django.db.utils import load_backend
+
+from tests.conftest import MANAGE_PATH
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 1000,
+    'temp_store': 'MEMORY',
+}
+
+
+@pytest.fixture
+def prod_connection(tmp_path):
+    backend = load_backend('api_yamdb.sqlite')
+    wrapper = backend.DatabaseWrapper({
+        **connection.settings_dict,
+        'ENGINE': 'api_yamdb.sqlite',
+        'NAME': str(tmp_path / 'prod.sqlite3'),
+        'OPTIONS': {'pragmas': PRAGMAS},
+    }, alias='sqlite_prod')
+    yield wrapper
+    wrapper.close()
+
+
+class Test25SQLiteProfile:
+
+    def test_01_profile_settings(self):
+        code = (
+            'import json; from api_yamdb import settings as s; '
+            'print(json.dumps([s.DATABASES["default"]["ENGINE"], '
+            's.DATABASES["default"]["CONN_MAX_AGE"], '
+            's.DATABASES["default"]["OPTIONS"]["pragmas"]]))'
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=MANAGE_PATH, check=True,
+            capture_output=True, text=True,
+            env={**os.environ, 'API_DATABASE_PROFILE': 'sqlite-prod'},
+        ).stdout
+        engine, max_age, pragmas = json.loads(output)
+        assert engine == 'api_yamdb.sqlite'
+        assert max_age > 0, 'Проверьте постоянные соединения в sqlite-prod.'
+        assert pragmas['journal_mode'] == 'WAL'
+        assert pragmas['busy_timeout'] > 0
+
+    @pytest.mark.django_db
+    def test_02_pragmas_applied(self, prod_connection):
+        with prod_connection.cursor() as cursor:
+            values = {}
+            for name in PRAGMAS:
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+        assert values == {
+            'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 1000,
+            'temp_store': 2,
+        }, 'Проверьте, что прагмы применяются к новому соединению.'
+
+    @pytest.mark.django_db
+    def test_03_immediate_transactions(self, prod_connection):
+        with prod_connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        other = sqlite3.connect(
+            prod_connection.settings_dict['NAME'], timeout=0,
+            isolation_level=None,
+        )
+        try:
+            prod_connection._start_transaction_under_autocommit()
+            with pytest.raises(sqlite3.OperationalError):
+                other.execute('INSERT INTO item VALUES (1)')
+            prod_connection.cursor().execute('ROLLBACK')
+            other.execute('INSERT INTO item VALUES (1)')
+        finally:
+            other.close()
@@ -0,0 +1,200 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, connections
+
+from api.cache import FRESH_KEY, bump_generation
+from api.routers import replica_pool
+from reviews.models import Genre, Title
+
+REPLICAS = ('replica_1', 'replica_2')
+GENRES_URL = '/api/v1/genres/'
+
+
+def add_replica(alias, path):
+    connections.databases[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': f'file:{path}?mode=ro'
+    }
+
+
+def add_marker(path, slug):
+    """Жанр, который есть только в файле реплики."""
+    with sqlite3.connect(path) as replica:
+        replica.execute(
+            'INSERT INTO reviews_genre (name, slug) VALUES (?, ?)',
+            (slug, slug),
+        )
+
+
+@pytest.fixture
+def replicas(settings, tmp_path, user, admin):
+    """Две реплики — копии основной БД на момент вызова фикстуры."""
+    Title.objects.create(name='Произведение', year=2000)
+    connection.ensure_connection()
+    paths = {}
+    for alias in REPLICAS:
+        paths[alias] = tmp_path / f'{alias}.sqlite3'
+        replica = sqlite3.connect(paths[alias])
+        connection.connection.backup(replica)
+        replica.close()
+        add_marker(paths[alias], alias)
+        add_replica(alias, paths[alias])
+    settings.READ_REPLICAS = {
+        **settings.READ_REPLICAS, 'ALIASES': list(REPLICAS),
+        'STRATEGY': 'round_robin',
+    }
+    settings.MIDDLEWARE = [
+        *settings.MIDDLEWARE, 'api.middleware.ReplicaRoutingMiddleware'
+    ]
+    replica_pool.reset()
+    bump_generation()
+    yield paths
+    for alias in (*REPLICAS, 'broken'):
+        if alias in connections.databases:
+            connections[alias].close()
+            del connections.databases[alias]
+            if hasattr(connections._connections, alias):
+                delattr(connections._connections, alias)
+    replica_pool.reset()
+
+
+def read_markers(client, count=1):
+    markers = []
+    for _ in range(count):
+        bump_generation()
+        response = client.get(GENRES_URL)
+        assert response.status_code == HTTPStatus.OK
+        markers.extend(
+            genre['slug'] for genre in response.json()['results']
+            if genre['slug'].startswith('replica') or genre['slug'] == 'new'
+        )
+    return markers
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ReadReplicas:
+
+    def test_01_round_robin(self, client, replicas):
+        assert read_markers(client, 4) == [
+            'replica_1', 'replica_2', 'replica_1', 'replica_2'
+        ], 'Проверьте, что GET-запросы читают с реплик по кругу.'
+        assert not Genre.objects.filter(slug__startswith='replica').exists(), (
+            'Проверьте, что чтение вне запросов идёт в основную БД.'
+        )
+
+    def test_02_least_latency(self, client, replicas, settings):
+        settings.READ_REPLICAS = {
+            **settings.READ_REPLICAS, 'STRATEGY': 'least_latency'
+        }
+        replica_pool.latency.update({'replica_1': 10.0, 'replica_2': 0.0})
+        assert read_markers(client, 3) == ['replica_2'] * 3, (
+            'Проверьте выбор реплики с наименьшей задержкой.'
+        )
+
+    def test_03_writes_and_pinning(self, user_client, admin_client,
+                                   replicas):
+        response = admin_client.post(
+            GENRES_URL, data={'name': 'Новый', 'slug': 'new'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert Genre.objects.filter(slug='new').exists(), (
+            'Проверьте, что запись идёт в основную БД.'
+        )
+        assert read_markers(admin_client) == ['new'], (
+            'Проверьте, что после записи клиент читает с основной БД.'
+        )
+        assert 'new' not in read_markers(user_client), (
+            'Проверьте, что другие клиенты продолжают читать с реплик.'
+        )
+        cache.clear()
+        assert 'new' not in read_markers(admin_client)
+
+    def test_04_review_visible_after_post(self, user_client, replicas):
+        title = Title.objects.get()
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert user_client.get(url).json()['count'] == 1, (
+            'Проверьте, что автор сразу видит свой отзыв в списке.'
+        )
+
+    def test_05_fallback(self, client, replicas, settings, tmp_path):
+        missing = tmp_path / 'missing.sqlite3'
+        add_replica('broken', missing)
+        settings.READ_REPLICAS = {
+            **settings.READ_REPLICAS, 'ALIASES': ['broken', 'replica_2']
+        }
+        assert read_markers(client, 2) == ['replica_2', 'replica_2'], (
+            'Проверьте, что при ошибке реплики чтение идёт с другой реплики.'
+        )
+        assert 'broken' in replica_pool.down_until
+        settings.READ_REPLICAS = {
+            **settings.READ_REPLICAS, 'ALIASES': ['broken']
+        }
+        assert read_markers(client) == [], (
+            'Проверьте, что без доступных реплик чтение идёт с основной БД.'
+        )
+        assert not missing.exists(), (
+            'Проверьте, что реплика открывается только для чтения и не '
+            'создаёт пустой файл.'
+        )
+
+    def test_06_empty_replica_skipped(self, client, replicas, settings,
+                                      tmp_path):
+        empty = tmp_path / 'empty.sqlite3'
+        sqlite3.connect(empty).close()
+        add_replica('broken', empty)
+        settings.READ_REPLICAS = {
+            **settings.READ_REPLICAS, 'ALIASES': ['broken', 'replica_2']
+        }
+        assert read_markers(client) == ['replica_2'], (
+            'Проверьте, что проверочный запрос отсеивает реплику без '
+            'таблиц приложения.'
+        )
+
+    def test_07_read_error_retried_on_primary(self, client, replicas,
+                                              settings):
+        with sqlite3.connect(replicas['replica_1']) as replica:
+            replica.execute('DROP TABLE reviews_genre')
+        settings.READ_REPLICAS = {
+            **settings.READ_REPLICAS, 'ALIASES': ['replica_1']
+        }
+        assert read_markers(client) == [], (
+            'Проверьте, что запрос, чтение которого упало на реплике, '
+            'повторяется на основной БД.'
+        )
+        assert 'replica_1' in replica_pool.down_until
+
+    def test_08_no_stale_cache_after_write(self, client, admin_client,
+                                           replicas):
+        response = admin_client.post(
+            GENRES_URL, data={'name': 'Новый', 'slug': 'new'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = client.get(GENRES_URL)
+        slugs = [genre['slug'] for genre in response.json()['results']]
+        assert 'new' not in slugs
+        assert 'ETag' not in response, (
+            'Проверьте, что ответ отстающей реплики не получает ETag '
+            'нового поколения каталога.'
+        )
+        for path in replicas.values():
+            add_marker(path, 'new')
+        response = client.get(GENRES_URL)
+        assert 'new' in [
+            genre['slug'] for genre in response.json()['results']
+        ], (
+            'Проверьте, что ответ реплики, прочитанный сразу после '
+            'записи, не сохраняется в кэше каталога.'
+        )
+        cache.delete(FRESH_KEY)
+        first = client.get(GENRES_URL)
+        assert first.has_header('ETag'), (
+            'Проверьте, что после окна отставания реплик ответы '
+            'снова кэшируются.'
+        )
+        add_marker(replicas['replica_1'], 'later')
+        add_marker(replicas['replica_2'], 'later')
+        assert client.get(GENRES_URL).json() == first.json()
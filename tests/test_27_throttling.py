@@ -0,0 +1,122 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.throttling import TokenBucketStore
+from reviews.models import Review, Title
+
+
+class Clock:
+
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Test27TokenBucket:
+
+    def test_01_burst_and_refill(self):
+        clock = Clock()
+        store = TokenBucketStore(clock=clock)
+        assert [store.consume('key', 1.0, 3) for _ in range(3)] == [None] * 3
+        assert store.consume('key', 1.0, 3) == pytest.approx(1.0), (
+            'Проверьте, что после исчерпания ёмкости возвращается ожидание.'
+        )
+        assert store.consume('other', 1.0, 3) is None
+        clock.now += 0.5
+        assert store.consume('key', 1.0, 3) == pytest.approx(0.5)
+        clock.now += 0.5
+        assert store.consume('key', 1.0, 3) is None, (
+            'Проверьте пополнение корзины со временем.'
+        )
+
+    def test_02_prune_full_buckets(self):
+        clock = Clock()
+        store = TokenBucketStore(clock=clock)
+        store.max_keys = 2
+        store.consume('a', 1.0, 2)
+        store.consume('b', 1.0, 2)
+        clock.now += 10
+        store.consume('c', 1.0, 2)
+        assert set(store._buckets) == {'c'}, (
+            'Проверьте, что полные корзины удаляются при переполнении.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Throttling:
+
+    def test_01_signup(self, client, settings):
+        settings.THROTTLE_RATES = {'signup': ('1/min', 2)}
+        for i in range(3):
+            response = client.post('/api/v1/auth/signup/', data={
+                'email': f'user{i}@yamdb.fake', 'username': f'user{i}'
+            })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте ограничение частоты регистраций.'
+        )
+        assert response['Retry-After'] == '60'
+
+    def test_02_review_write(self, user_client, admin_client, settings):
+        settings.THROTTLE_RATES = {'review-write': ('10/min', 2)}
+        titles = [
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(4)
+        ]
+        statuses = [
+            user_client.post(
+                f'/api/v1/titles/{title.id}/reviews/',
+                data={'text': 'Отзыв', 'score': 5},
+            ).status_code
+            for title in titles[:3]
+        ]
+        assert statuses == [
+            HTTPStatus.CREATED, HTTPStatus.CREATED,
+            HTTPStatus.TOO_MANY_REQUESTS,
+        ], 'Проверьте ограничение частоты записи отзывов.'
+        assert Review.objects.count() == 2
+        response = user_client.get(f'/api/v1/titles/{titles[0].id}/reviews/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ограничение записи не касается чтения.'
+        )
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[3].id}/reviews/',
+            data={'text': 'Отзыв', 'score': 5},
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что лимит считается отдельно для каждого пользователя.'
+        )
+
+    def test_03_comment_write(self, user_client, settings):
+        settings.THROTTLE_RATES = {'comment-write': ('10/min', 1)}
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 5},
+        ).json()
+        url = f'/api/v1/titles/{title.id}/reviews/{review["id"]}/comments/'
+        statuses = [
+            user_client.post(url, data={'text': 'Комментарий'}).status_code
+            for _ in range(2)
+        ]
+        assert statuses == [
+            HTTPStatus.CREATED, HTTPStatus.TOO_MANY_REQUESTS
+        ], 'Проверьте ограничение частоты записи комментариев.'
+
+    def test_04_anonymous_read(self, client, user_client, settings):
+        settings.THROTTLE_RATES = {'anon-read': ('60/min', 3)}
+        statuses = [
+            client.get('/api/v1/genres/').status_code for _ in range(4)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте ограничение частоты чтения для анонимов.'
+        )
+        assert int(client.get('/api/v1/titles/')['Retry-After']) == 1
+        for _ in range(4):
+            assert user_client.get('/api/v1/genres/').status_code == (
+                HTTPStatus.OK
+            ), 'Проверьте, что чтение пользователей не ограничивается.'
+        settings.THROTTLE_RATES = {}
+        assert client.get('/api/v1/genres/').status_code == HTTPStatus.OK
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.permissions import (ADMIN, AUTHENTICATED, MODERATE,
+                             IsAuthorAdminModeratorOrReadOnly,
+                             get_capabilities)
+from reviews.models import Review, Title
+
+
+def make_request(user, method='patch'):
+    request = Request(getattr(APIRequestFactory(), method)('/'))
+    request.user = user
+    return request
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Permissions:
+
+    def test_01_capabilities(self, user, moderator, admin, user_superuser):
+        assert get_capabilities(make_request(AnonymousUser())) == set()
+        assert get_capabilities(make_request(user)) == {AUTHENTICATED}
+        assert get_capabilities(make_request(moderator)) == {
+            AUTHENTICATED, MODERATE
+        }
+        for privileged in (admin, user_superuser):
+            assert get_capabilities(make_request(privileged)) == {
+                AUTHENTICATED, MODERATE, ADMIN
+            }, 'Проверьте возможности администратора и суперпользователя.'
+        request = make_request(user)
+        assert get_capabilities(request) is get_capabilities(request), (
+            'Проверьте, что возможности вычисляются один раз на запрос.'
+        )
+
+    def test_02_author_check_without_queries(self, user, moderator,
+                                             django_user_model):
+        title = Title.objects.create(name='Произведение', year=2000)
+        Review.objects.create(author=user, title=title, text='Отзыв', score=5)
+        reviews = list(Review.objects.only('id', 'author_id'))
+        permission = IsAuthorAdminModeratorOrReadOnly()
+        request = make_request(user)
+        other = make_request(django_user_model(pk=10 ** 6, role='user'))
+        with CaptureQueriesContext(connection) as context:
+            allowed = [
+                permission.has_object_permission(request, None, review)
+                for review in reviews
+            ]
+            denied = permission.has_object_permission(other, None, reviews[0])
+        assert allowed == [True] and not denied
+        assert not context.captured_queries, (
+            'Проверьте, что автор сравнивается по author_id без загрузки '
+            'пользователя.'
+        )
+        assert permission.has_object_permission(
+            make_request(moderator), None, reviews[0]
+        )
+
+    def test_03_moderator_can_delete(self, user_client, moderator_client):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 5},
+        ).json()
+        url = f'/api/v1/titles/{title.id}/reviews/{review["id"]}/'
+        response = user_client.patch(url, data={'text': 'Исправлено'})
+        assert response.status_code == HTTPStatus.OK
+        response = moderator_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+LIST_QUERIES = 2
+DETAIL_QUERIES = 1
+CREATE_QUERIES = 2
+
+
+@pytest.fixture
+def review_comments(django_user_model):
+    titles = [
+        Title.objects.create(name=f'Произведение {i}', year=2000)
+        for i in range(2)
+    ]
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{i}', email=f'author{i}@yamdb.fake'
+        )
+        for i in range(10)
+    ]
+    review = Review.objects.create(
+        author=authors[0], title=titles[0], text='Отзыв', score=5
+    )
+    for author in authors:
+        Comment.objects.create(author=author, review=review, text='Текст')
+    return titles, review
+
+
+def comments_url(title, review):
+    return f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29CommentQueries:
+
+    @pytest.mark.parametrize('fast', [True, False])
+    @pytest.mark.parametrize('query', ['', '?fields=id,author', '?fields=id'])
+    def test_01_list_queries(self, client, review_comments, settings,
+                             django_assert_num_queries, fast, query):
+        settings.FAST_READ_SERIALIZERS = fast
+        titles, review = review_comments
+        with django_assert_num_queries(LIST_QUERIES):
+            response = client.get(comments_url(titles[0], review) + query)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == 10
+        if 'author' in results[0]:
+            assert {comment['author'] for comment in results} == {
+                f'author{i}' for i in range(10)
+            }
+
+    def test_02_detail_queries(self, client, review_comments,
+                               django_assert_num_queries):
+        titles, review = review_comments
+        comment = review.comments.first()
+        with django_assert_num_queries(DETAIL_QUERIES):
+            response = client.get(
+                f'{comments_url(titles[0], review)}{comment.id}/'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['author'] == comment.author.username
+
+    def test_03_create_queries(self, user_client, review_comments,
+                               django_assert_num_queries):
+        titles, review = review_comments
+        url = comments_url(titles[0], review)
+        user_client.get(url)
+        with django_assert_num_queries(CREATE_QUERIES):
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == 'TestUser'
+
+    def test_04_wrong_title(self, client, user_client, review_comments):
+        titles, review = review_comments
+        url = comments_url(titles[1], review)
+        comment = review.comments.first()
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что список комментариев проверяет пару '
+            '(title_id, review_id).'
+        )
+        assert client.get(f'{url}{comment.id}/').status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        review.comments.all().delete()
+        response = client.get(comments_url(titles[0], review))
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [], (
+            'Проверьте, что у существующего отзыва без комментариев '
+            'возвращается пустой список.'
+        )
+        response = client.get(f'{url}?pagination=cursor')
+        assert response.status_code == HTTPStatus.NOT_FOUND